@@ -8,11 +8,21 @@ from agent_work_log import send_work_log
 from context_handling import (set_conversation_context, load_conversation,
                                     get_all_from_message_queue, add_to_message_queue)
 from llm import run_inference
-from tools_utils import get_tool_list, execute_tool, deal_with_tool_results
+from tools_utils import get_tool_list, get_tools_by_name, get_tools_param, execute_tool, deal_with_tool_results
 from util import get_user_message, get_new_messages_from_group_chat, get_new_summaries, log_error, \
     generate_restart_summary, save_conv_and_restart
 
 
+def echo_block(block) -> dict:
+    """Returns the text or tool_use block as the dict sent back to the LLM, built in one go"""
+    if block.type == "text":
+        return {"type": "text", "text": block.text, "cache_control": {"type": "ephemeral"}}
+    if block.type == "tool_use":
+        return {"type": "tool_use", "id": block.id, "name": block.name, "input": block.input,
+                "cache_control": {"type": "ephemeral"}}
+    raise ValueError(f"Cannot echo a {block.type} block")
+
+
 def get_new_message(is_team_mode: bool, consecutive_tool_count: list, read_user_input: bool) -> dict | None:
     if is_team_mode:
         # check message queue for new messages
@@ -49,6 +59,9 @@ class Agent:
     def __init__(self, agent_name: str, llm_client, team_mode: bool, turn_delay=0):
         self.llm_client = llm_client
         self.tools = get_tool_list(team_mode)
+        self.tools_by_name = get_tools_by_name(self.tools)
+        # The tools never change while the agent runs, so the API parameter is built once and reused every turn
+        self.tools_param = get_tools_param(team_mode)
         self.is_team_mode = team_mode
         self.read_user_input = not team_mode  # initialise to True if not in team mode
         # Initialize counter for tracking consecutive tool calls without human interaction
@@ -146,7 +159,7 @@ class Agent:
             response_content, token_usage = run_inference(conversation, self.llm_client, self.tools,
                                                           self.consecutive_tool_count,
                                                           self.name, self.is_team_mode,
-                                                          self.max_consecutive_tools)
+                                                          self.max_consecutive_tools, self.tools_param)
             tool_results = []
             print_text = ""
             # print assistant text and collect any tool calls
@@ -168,7 +181,7 @@ class Agent:
                         print(
                             f"\033[96mConsecutive tool count: {self.consecutive_tool_count}/{self.max_consecutive_tools}\033[0m")
                     if block.type == "tool_use":
-                        result = execute_tool(self.tools, block.name, block.input)
+                        result = execute_tool(self.tools_by_name, block.name, block.input)
                         tool_results.append({
                             "type": "tool_result",
                             "tool_use_id": block.id,
@@ -184,20 +197,8 @@ class Agent:
                 if b.type in ["text", "tool_use"]:
                     conversation.append({
                         "role": "assistant",
-                        "content": [
-                            # for each block LLM returned, mirror it exactly
-                            {
-                                "type": b.type,
-                                **({
-                                       "text": b.text
-                                   } if b.type == "text" else {
-                                    "id": b.id,
-                                    "name": b.name,
-                                    "input": b.input
-                                }),
-                                "cache_control": {"type": "ephemeral"}
-                            }
-                        ]
+                        # for each block LLM returned, mirror it exactly
+                        "content": [echo_block(b)]
                     })
                 elif b.type == "server_tool_use":
                     conversation.append({
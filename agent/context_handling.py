@@ -1,13 +1,18 @@
+import gzip
 import os
 import pickle
 import queue
 import sys
 
-from util import log_error
+from json_utils import loads
+from util import CONTEXT_FILE, LEGACY_CONTEXT_FILE, log_error
 
 # Global conversation context
 conversation_context = None
 
+# First bytes of a gzip stream, files without them are read as plain JSON
+GZIP_MAGIC = b"\x1f\x8b"
+
 # Message queue for messages that the agent needs to process
 message_queue = queue.Queue()
 
@@ -52,21 +57,31 @@ def cleanup_context():
             print("Context preserved due to error exit.")
         return
 
-    context_file = "conversation_context.pkl"
-    if os.path.exists(context_file):
-        try:
-            os.remove(context_file)
-            print(f"\nContext file '{context_file}' deleted.")
-        except Exception as e:
-            print(f"\nError deleting context file: {str(e)}")
-            log_error(f"Error deleting context file: {str(e)}")
+    for context_file in (CONTEXT_FILE, LEGACY_CONTEXT_FILE):
+        if os.path.exists(context_file):
+            try:
+                os.remove(context_file)
+                print(f"\nContext file '{context_file}' deleted.")
+            except Exception as e:
+                print(f"\nError deleting context file: {str(e)}")
+                log_error(f"Error deleting context file: {str(e)}")
 
 
-def load_conversation(save_file="conversation_context.pkl"):
+def load_conversation(save_file=CONTEXT_FILE):
     """Load conversation context from a file if it exists"""
     if os.path.exists(save_file):
         try:
             with open(save_file, 'rb') as f:
+                data = f.read()
+            if data[:2] == GZIP_MAGIC:
+                data = gzip.decompress(data)
+            return loads(data)
+        except Exception as e:
+            print(f"Error loading conversation: {str(e)}")
+    elif save_file == CONTEXT_FILE and os.path.exists(LEGACY_CONTEXT_FILE):
+        # Context pickled by an older version before its restart, the next save writes JSON
+        try:
+            with open(LEGACY_CONTEXT_FILE, 'rb') as f:
                 return pickle.load(f)
         except Exception as e:
             print(f"Error loading conversation: {str(e)}")
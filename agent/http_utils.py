@@ -0,0 +1,13 @@
+"""
+Shared HTTP session for the calls to other agents and services.
+Reusing one session keeps connections alive and pooled instead of opening a new one per request.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
+# For bodies serialized up front with json_utils, passed as data= instead of letting requests encode json=
+JSON_HEADERS = {"Content-Type": "application/json"}
@@ -0,0 +1,41 @@
+"""
+JSON helpers for the hot tool paths.
+Uses orjson when it is installed and falls back to the standard library otherwise,
+so a missing wheel never stops the agent from starting.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+if orjson is not None:
+    def dumps(obj) -> str:
+        """Serializes obj to a compact JSON string."""
+        return orjson.dumps(obj).decode()
+
+    def dumps_bytes(obj) -> bytes:
+        """Serializes obj to compact UTF-8 JSON, for writing straight to a binary file."""
+        return orjson.dumps(obj)
+
+    def dumps_indented(obj) -> bytes:
+        """Serializes obj to UTF-8 JSON indented by two spaces, for files people read."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    # Takes str or bytes, errors are json.JSONDecodeError subclasses in both cases
+    loads = orjson.loads
+else:
+    def dumps(obj) -> str:
+        """Serializes obj to a compact JSON string."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    def dumps_bytes(obj) -> bytes:
+        """Serializes obj to compact UTF-8 JSON, for writing straight to a binary file."""
+        return dumps(obj).encode()
+
+    def dumps_indented(obj) -> bytes:
+        """Serializes obj to UTF-8 JSON indented by two spaces, for files people read."""
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
+    loads = json.loads
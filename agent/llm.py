@@ -36,7 +36,7 @@ def remove_all_but_last_three_cache_controls(conversation):
 
 
 def run_inference(conversation, llm_client, tools, consecutive_tool_count = 0, agent_name: str = "Claude", is_team_mode: bool = False,
-                  max_consecutive_tools=10) -> tuple[dict, int]:
+                  max_consecutive_tools=10, tools_param: list | None = None) -> tuple[dict, int]:
     """
     Runs inference using the LLM client with the provided conversation and tools.
     :param conversation:
@@ -46,11 +46,13 @@ def run_inference(conversation, llm_client, tools, consecutive_tool_count = 0, a
     :param agent_name:
     :param is_team_mode:
     :param max_consecutive_tools:
+    :param tools_param: The tools as sent to the API, built from is_team_mode if not given.
     :return: The LLM response and the total token usage (excluding cached tokens!).
     """
     response: Any = None
-    from agent.tools_utils import get_tools_param
-    tools_param = get_tools_param(is_team_mode)
+    if tools_param is None:
+        from tools_utils import get_tools_param
+        tools_param = get_tools_param(is_team_mode)
 
 
     # If we've hit our consecutive tool limit, we'll force Claude to use the ask_human tool
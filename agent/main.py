@@ -1,6 +1,7 @@
 import argparse
 import atexit
 import sys
+import traceback
 
 import anthropic
 
@@ -8,6 +9,7 @@ from api import start_api
 from base_agent import Agent
 from context_handling import (cleanup_context)
 from team_config_loader import get_current_agent_name, initialize_team_config
+from tools.send_agent_message_tool import prewarm_agent_connections
 from util import log_error, get_agent_turn_delay_in_ms
 
 parser = argparse.ArgumentParser(description="Agent")
@@ -32,6 +34,8 @@ def main():
 
     try:
         start_api(team_config.get_current_agent())
+        if team_mode:
+            prewarm_agent_connections()
         agent_name = get_current_agent_name()
 
         agent = Agent(agent_name, anthropic_client, team_mode, turn_delay=get_agent_turn_delay_in_ms(number_of_agents))
@@ -40,7 +44,6 @@ def main():
     except Exception as e:
         error_message = f"Unhandled exception: {str(e)}"
         log_error(error_message)
-        import traceback
         error_details = traceback.format_exc()
         log_error(error_details)
         print(f"\nAn error occurred: {str(e)}")
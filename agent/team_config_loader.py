@@ -5,6 +5,8 @@ from typing import List, Optional
 
 
 class AgentConfig:
+    __slots__ = ("name", "host", "port", "is_current_agent")
+
     def __init__(self, name: str, host: str, port: int, is_current_agent: bool):
         self.name = name
         self.host = host
@@ -16,6 +18,8 @@ class AgentConfig:
 
 
 class TeamConfig:
+    __slots__ = ("agents",)
+
     def __init__(self, agents: List[AgentConfig]):
         self.agents = agents
 
@@ -29,10 +33,13 @@ class TeamConfig:
 
 # Cache for the team configuration to avoid reloading it multiple times
 TEAM_CONFIG: Optional[TeamConfig] = None
+# Arguments of initialize_team_config, reused by reload_team_config
+TEAM_CONFIG_ARGS: dict = {}
+TEAM_CONFIG_FILE = "team-config.json"
 
 
 def load_team_config(
-        config_path: str = "team-config.json",
+        config_path: str = TEAM_CONFIG_FILE,
         docker_mode: bool = False,
         docker_agent_index: Optional[int] = None,
         docker_host_base: Optional[str] = None,
@@ -110,17 +117,30 @@ def initialize_team_config(
     Returns:
         The TeamConfig, either from the cache or newly loaded.
     """
-    global TEAM_CONFIG
+    global TEAM_CONFIG, TEAM_CONFIG_ARGS
     if TEAM_CONFIG is None:
-        TEAM_CONFIG = load_team_config(
-            docker_mode=docker_mode,
-            docker_agent_index=docker_agent_index,
-            docker_host_base=docker_host_base,
-        )
+        TEAM_CONFIG_ARGS = {
+            "docker_mode": docker_mode,
+            "docker_agent_index": docker_agent_index,
+            "docker_host_base": docker_host_base,
+        }
+        TEAM_CONFIG = load_team_config(**TEAM_CONFIG_ARGS)
 
     return TEAM_CONFIG
 
 
+def reload_team_config() -> TeamConfig:
+    """
+    Loads the team configuration file again, with the arguments it was initialized with.
+
+    Returns:
+        The newly loaded TeamConfig, which also replaces the cached one.
+    """
+    global TEAM_CONFIG
+    TEAM_CONFIG = load_team_config(**TEAM_CONFIG_ARGS)
+    return TEAM_CONFIG
+
+
 def get_team_config() -> TeamConfig:
     """
     Retrieves the team configuration from the cache.
@@ -150,12 +170,9 @@ def get_agent_endpoints() -> dict[str, str]:
     """
     Returns a dictionary mapping agent names to their API endpoints.
     """
-    team_config = get_team_config()
-    endpoints = {}
-
-    for agent in team_config.agents:
-        if not agent.is_current_agent:
-            endpoint = f"http://{agent.host}:{agent.port}"
-            endpoints[agent.name] = endpoint
-
-    return endpoints
+    # %s rather than %d for the port: a port given as a string in team-config.json must still work
+    return {
+        agent.name: "http://%s:%s" % (agent.host, agent.port)
+        for agent in get_team_config().agents
+        if not agent.is_current_agent
+    }
@@ -1,8 +1,6 @@
 # ask_human_tool.py
 
-import json
-
-from tools.base_tool import ToolDefinition
+from tools.base_tool import ToolDefinition, parse_input
 
 
 def get_user_message():
@@ -45,8 +43,7 @@ def ask_human(input_data: dict) -> str:
     Returns the human's response as a string.
     """
     # Allow raw JSON string or parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     question = input_data.get("question", "")
     reason = input_data.get("reason", "")
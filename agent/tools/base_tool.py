@@ -1,6 +1,34 @@
+import functools
+import shlex
+
+from json_utils import loads
+
+
 class ToolDefinition:
     def __init__(self, name: str, description: str, input_schema: dict, function):
         self.name = name
         self.description = description
         self.input_schema = input_schema
         self.function = function
+        # The entry sent in the `tools` parameter of every inference request, built once per tool
+        self.tool_param = {
+            "name": name,
+            "description": description,
+            "input_schema": input_schema
+        }
+
+
+@functools.lru_cache(maxsize=256)
+def split_args(text: str) -> tuple[str, ...]:
+    """
+    shlex.split with a cache, agents tend to run the same commands over and over.
+    Returns a tuple so the cached result can't be mutated by callers.
+    """
+    return tuple(shlex.split(text))
+
+
+def parse_input(input_data):
+    """Returns the tool input as a dict, parsing it first if it arrived as raw JSON text or bytes."""
+    if isinstance(input_data, (str, bytes, bytearray)):
+        return loads(input_data)
+    return input_data
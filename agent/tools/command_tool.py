@@ -1,27 +1,68 @@
 # command_line_tool.py
 
-import json
 import os
-import shlex
+import select
+import selectors
+import shutil
 import subprocess
 import threading
 import time
+from collections import deque
 
-from tools.base_tool import ToolDefinition
+from json_utils import dumps
+from tools.base_tool import ToolDefinition, split_args, parse_input
 
 # ------------------------------------------------------------------
 # Global process storage for persistent processes
+# Kept when the module is reloaded, so running processes are not orphaned
 # ------------------------------------------------------------------
-active_processes = {}
-process_counter = 0
+if "active_processes" not in globals():
+    active_processes = {}
+    process_counter = 0
+    registry_lock = threading.Lock()
+
+# ------------------------------------------------------------------
+# Number of output lines kept per stream of a persistent process
+OUTPUT_BUFFER_LINES = 1000
+
+# ------------------------------------------------------------------
+# Output pump: a single thread drains the pipes of all persistent processes
+# and reaps the finished ones
+# ------------------------------------------------------------------
+PIPE_READ_SIZE = 65536  # bytes read from a pipe per syscall
+REAPER_INTERVAL = 5  # seconds between two reaper passes
+FINISHED_PROCESS_TTL = 300  # seconds a finished process stays inspectable before it is dropped
+if "pump_selector" not in globals():  # a reload must not start a second pump
+    pump_selector = selectors.DefaultSelector()
+    pump_thread = None
+    pump_wakeup = threading.Event()  # set when a process is registered, the pump sleeps on it while idle
+
+# Seconds to wait for a process to accept input on its stdin
+INPUT_TIMEOUT = 10
+
+# Resolved absolute paths of the programs run by execute_command_and_wait
+EXECUTABLE_PATHS = {}
+
+# Colors used when echoing process output to the console
+DEBUG_COLOR = "\033[36m"  # Cyan
+RESET_COLOR = "\033[0m"  # Reset to default
 
 # ------------------------------------------------------------------
 # Blacklist of blocked commands
 # ------------------------------------------------------------------
-BLOCKED_COMMANDS = {
+BLOCKED_COMMANDS = frozenset({
     "rm", "shutdown", "reboot", "halt", "poweroff", "mkfs", "dd", "init", "telinit", "kill", "killall", "passwd",
     "whoami"
-}
+})
+
+# Characters that make shlex treat the first word differently than str.split would
+SHELL_QUOTE_CHARS = frozenset("'\"\\")
+
+# ------------------------------------------------------------------
+# Static responses, serialized once
+# ------------------------------------------------------------------
+NO_ACTIVE_PROCESSES_RESPONSE = dumps({"success": True, "processes": [], "message": "No active processes"})
+INVALID_ACTION_RESPONSE = dumps({"success": False, "error": "Invalid action or missing process_id"})
 
 # ------------------------------------------------------------------
 # Input schema for the command_line_tool
@@ -67,8 +108,7 @@ def command_line_tool(input_data: dict) -> str:
     """
     global active_processes, process_counter
 
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     # Handle process management actions or input to existing process
     process_action = input_data.get("process_action")
@@ -89,22 +129,22 @@ def command_line_tool(input_data: dict) -> str:
     if not command and not process_action:
         raise ValueError("Command must be provided")
 
-    # Build the full command for display
-    cmd_parts = shlex.split(command)
-    if args:
-        cmd_parts.extend(shlex.split(args))
-
-    full_command = " ".join(cmd_parts)
-
-    # Blacklist check
-    base_cmd = cmd_parts[0]
+    # Blacklist check, only needs the program name
+    base_cmd = get_base_command(command)
     if base_cmd in BLOCKED_COMMANDS:
         error_msg = f"Command '{base_cmd}' is not allowed for security reasons."
-        return json.dumps({
+        return dumps({
             "success": False,
             "error": error_msg
         })
 
+    # Build the full command for display
+    cmd_parts = list(split_args(command))
+    if args:
+        cmd_parts.extend(split_args(args))
+
+    full_command = " ".join(cmd_parts)
+
     try:
         if keep_alive:
             return start_persistent_process(cmd_parts, full_command)
@@ -112,32 +152,63 @@ def command_line_tool(input_data: dict) -> str:
             return execute_command_and_wait(cmd_parts, full_command)
     except Exception as e:
         error_msg = str(e)
-        return json.dumps({
+        return dumps({
             "success": False,
             "error": error_msg,
             "command_attempted": full_command
         })
 
 
+def get_base_command(command: str) -> str:
+    """
+    Returns the program name of a command line.
+    Only falls back to shlex if the first word contains quotes or escapes, e.g. "'rm' -rf".
+    """
+    words = command.split(None, 1)
+    if not words:
+        return ""
+    if SHELL_QUOTE_CHARS.isdisjoint(words[0]):
+        return words[0]
+    parts = split_args(command)
+    return parts[0] if parts else ""
+
+
+def resolve_executable(program: str) -> str | None:
+    """
+    Absolute path of a program found in PATH, cached per program name.
+    Misses aren't cached, so programs installed later on are still found.
+    """
+    if os.sep in program:
+        return program
+    path = EXECUTABLE_PATHS.get(program)
+    if path is None:
+        path = shutil.which(program)
+        if path is not None:
+            EXECUTABLE_PATHS[program] = path
+    return path
+
+
 def execute_command_and_wait(cmd_parts, full_command):
     """Execute command and wait for completion"""
-    process = subprocess.Popen(
+    # CPython only uses posix_spawn instead of fork+exec if the executable is given as a path, there is no
+    # cwd override (the child inherits ours anyway), no preexec_fn and close_fds=False.
+    # Descriptors opened by Python are non-inheritable, so close_fds=False leaks nothing.
+    process = subprocess.run(
         cmd_parts,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        executable=resolve_executable(cmd_parts[0]),
+        capture_output=True,
         text=True,
-        cwd=os.getcwd()
+        close_fds=False,
     )
-    stdout, stderr = process.communicate()
 
     result = {
         "success": process.returncode == 0,
-        "stdout": stdout.strip(),
-        "stderr": stderr.strip(),
+        "stdout": process.stdout.strip(),
+        "stderr": process.stderr.strip(),
         "returncode": process.returncode,
         "command_executed": full_command
     }
-    return json.dumps(result)
+    return dumps(result)
 
 
 def start_persistent_process(cmd_parts, full_command):
@@ -150,32 +221,35 @@ def start_persistent_process(cmd_parts, full_command):
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             stdin=subprocess.PIPE,
-            text=True,
-            cwd=os.getcwd(),
-            bufsize=0  # Unbuffered for real-time interaction
+            cwd=os.getcwd()
         )
 
-        process_counter += 1
-        process_id = process_counter
-
         # Store process info
-        active_processes[process_id] = {
-            "process": process,
-            "command": full_command,
-            "start_time": time.time(),
-            "output_buffer": [],
-            "error_buffer": []
-        }
-
-        # Start background threads to capture output
+        with registry_lock:
+            process_counter += 1
+            process_id = process_counter
+            active_processes[process_id] = {
+                "process": process,
+                "command": full_command,
+                "start_time": time.time(),
+                # Ring buffers, the oldest lines are dropped once OUTPUT_BUFFER_LINES is reached.
+                # Only the pump thread appends, readers take a list() snapshot which is atomic under the GIL.
+                "output_buffer": deque(maxlen=OUTPUT_BUFFER_LINES),
+                "error_buffer": deque(maxlen=OUTPUT_BUFFER_LINES)
+            }
+
+        # Hand the pipes to the output pump, input is written with a timeout in send_input_to_process
         start_output_capture(process_id)
-
-        # Give the process a moment to start
-        time.sleep(0.1)
-
-        # Check if process is still running after startup
-        if process.poll() is not None:
-            return json.dumps({
+        os.set_blocking(process.stdin.fileno(), False)
+
+        # Report a process that is already gone, without sleeping on the start path.
+        # One that exits later shows up as "finished" in the status action.
+        try:
+            process.wait(timeout=0)
+        except subprocess.TimeoutExpired:
+            pass
+        else:
+            return dumps({
                 "success": False,
                 "error": f"Process {process_id} exited immediately with code {process.returncode}",
                 "command": full_command
@@ -188,10 +262,10 @@ def start_persistent_process(cmd_parts, full_command):
             "status": "running",
             "message": f"Process started with ID {process_id}. Use process_action to interact with it."
         }
-        return json.dumps(result)
+        return dumps(result)
 
     except Exception as e:
-        return json.dumps({
+        return dumps({
             "success": False,
             "error": f"Failed to start process: {str(e)}",
             "command": full_command
@@ -199,28 +273,98 @@ def start_persistent_process(cmd_parts, full_command):
 
 
 def start_output_capture(process_id):
-    """Start background threads to capture stdout and stderr"""
+    """Register the stdout and stderr pipes of a process with the output pump"""
     process_info = active_processes[process_id]
     process = process_info["process"]
 
-    def capture_stdout():
-        for line in iter(process.stdout.readline, ''):
-            if not line:
-                break
-            process_info["output_buffer"].append(line.rstrip())
-            if len(process_info["output_buffer"]) > 1000:  # Limit buffer size
-                process_info["output_buffer"] = process_info["output_buffer"][-500:]
+    for stream, buffer_name in ((process.stdout, "output_buffer"), (process.stderr, "error_buffer")):
+        # The pump only reads when select() reports data, but never let a read block the shared thread
+        os.set_blocking(stream.fileno(), False)
+        # Register the file object rather than the fd, it keeps the pipe open until we unregister it
+        pump_selector.register(stream, selectors.EVENT_READ,
+                               data={"buffer": process_info[buffer_name], "partial": b""})
 
-    def capture_stderr():
-        for line in iter(process.stderr.readline, ''):
-            if not line:
-                break
-            process_info["error_buffer"].append(line.rstrip())
-            if len(process_info["error_buffer"]) > 1000:  # Limit buffer size
-                process_info["error_buffer"] = process_info["error_buffer"][-500:]
+    start_pump()
 
-    threading.Thread(target=capture_stdout, daemon=True).start()
-    threading.Thread(target=capture_stderr, daemon=True).start()
+
+def drain_pipe(key):
+    """Read what is available on a pipe and append complete lines to its buffer"""
+    try:
+        chunk = os.read(key.fd, PIPE_READ_SIZE)
+    except BlockingIOError:
+        return
+    except OSError:
+        chunk = b""
+
+    state = key.data
+    if not chunk:
+        # EOF: keep an unterminated last line and stop watching the pipe
+        if state["partial"]:
+            state["buffer"].append(state["partial"].decode(errors="replace").rstrip())
+            state["partial"] = b""
+        pump_selector.unregister(key.fileobj)
+        return
+
+    # Split on bytes and decode whole lines only, a multi-byte character may straddle two reads
+    lines = (state["partial"] + chunk).split(b"\n")
+    state["partial"] = lines.pop()  # incomplete line, completed by the next read
+    state["buffer"].extend(line.decode(errors="replace").rstrip() for line in lines)
+
+
+def run_pump():
+    """Drain the pipes of all persistent processes and reap finished ones, runs forever in a daemon thread"""
+    last_reap = time.monotonic()
+    while True:
+        if not pump_selector.get_map():
+            # Nothing to read, sleep until start_pump() registers a pipe.
+            # Without any processes left there is nothing to reap either, so no timeout at all.
+            pump_wakeup.wait(REAPER_INTERVAL if active_processes else None)
+            pump_wakeup.clear()
+        else:
+            # select() returns as soon as a pipe is readable, the timeout only paces the reaper
+            for key, _ in pump_selector.select(timeout=REAPER_INTERVAL):
+                drain_pipe(key)
+
+        if time.monotonic() - last_reap >= REAPER_INTERVAL:
+            reap_finished_processes()
+            last_reap = time.monotonic()
+
+
+def start_pump():
+    """Start the output pump thread unless it is already running"""
+    global pump_thread
+    pump_wakeup.set()
+    if pump_thread is None or not pump_thread.is_alive():
+        pump_thread = threading.Thread(target=run_pump, daemon=True)
+        pump_thread.start()
+
+
+def reap_finished_processes():
+    """Drop processes that finished more than FINISHED_PROCESS_TTL seconds ago and close their pipes"""
+    now = time.time()
+    with registry_lock:
+        snapshot = list(active_processes.items())
+    for process_id, process_info in snapshot:
+        process = process_info["process"]
+        if process.poll() is None:
+            continue
+
+        # Remember when we first saw the process as finished, its output stays available until the TTL expires
+        finish_time = process_info.setdefault("finish_time", now)
+        if now - finish_time <= FINISHED_PROCESS_TTL:
+            continue
+
+        with registry_lock:
+            active_processes.pop(process_id, None)
+        try:
+            # A pipe may still be open if a grandchild inherited it, stop watching it before closing
+            for stream in (process.stdout, process.stderr):
+                if stream in pump_selector.get_map():
+                    pump_selector.unregister(stream)
+            # Closes all three pipes and reaps the already finished process
+            process.__exit__(None, None, None)
+        except Exception:
+            pass
 
 
 def handle_process_action(input_data):
@@ -238,33 +382,32 @@ def handle_process_action(input_data):
         return get_process_output(process_id)
     if action == "input" and process_id:
         return send_input_to_process(process_id, input_data.get("input_text", ""))
-    return json.dumps({"success": False, "error": "Invalid action or missing process_id"})
+    return INVALID_ACTION_RESPONSE
 
 
 def list_processes():
     """List all active processes and cleanup dead ones"""
-    if not active_processes:
-        return json.dumps({
-            "success": True,
-            "processes": [],
-            "message": "No active processes"
-        })
-
-    processes = []
-
-    for pid, info in active_processes.items():
-        process = info["process"]
-        is_running = process.poll() is None
-
-        processes.append({
+    # One snapshot under the lock, the reaper may drop entries while we build the response
+    with registry_lock:
+        snapshot = list(active_processes.items())
+    if not snapshot:
+        return NO_ACTIVE_PROCESSES_RESPONSE
+
+    strftime = time.strftime
+    localtime = time.localtime
+    processes = [None] * len(snapshot)
+
+    for i, (pid, info) in enumerate(snapshot):
+        return_code = info["process"].poll()
+        processes[i] = {
             "process_id": pid,
             "command": info["command"],
-            "status": "running" if is_running else "finished",
-            "start_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(info["start_time"])),
-            "return_code": process.returncode if not is_running else None
-        })
+            "status": "running" if return_code is None else "finished",
+            "start_time": strftime("%Y-%m-%d %H:%M:%S", localtime(info["start_time"])),
+            "return_code": return_code
+        }
 
-    return json.dumps({
+    return dumps({
         "success": True,
         "processes": processes,
     })
@@ -272,17 +415,18 @@ def list_processes():
 
 def get_process_status(process_id):
     """Get status of a specific process"""
-    if process_id not in active_processes:
-        return json.dumps({
+    # A single lookup, the reaper may drop the process between a membership test and an index
+    process_info = active_processes.get(process_id)
+    if process_info is None:
+        return dumps({
             "success": False,
             "error": f"Process {process_id} not found"
         })
 
-    process_info = active_processes[process_id]
     process = process_info["process"]
     is_running = process.poll() is None
 
-    return json.dumps({
+    return dumps({
         "success": True,
         "process_id": process_id,
         "command": process_info["command"],
@@ -296,29 +440,31 @@ def get_process_status(process_id):
 
 def get_process_output(process_id):
     """Get output from a specific process"""
-    if process_id not in active_processes:
-        return json.dumps({
+    # A single lookup, the reaper may drop the process between a membership test and an index
+    process_info = active_processes.get(process_id)
+    if process_info is None:
+        return dumps({
             "success": False,
             "error": f"Process {process_id} not found"
         })
 
-    process_info = active_processes[process_id]
     process = process_info["process"]
 
     # Check if process is still running
     is_running = process.poll() is None
 
-    output_lines = process_info["output_buffer"]
-    debug_color = "\033[36m"  # Cyan
-    reset_color = "\033[0m"  # Reset to default
-    for line in output_lines:
-        print(f"{debug_color}{line}{reset_color}")
+    # Snapshot the ring buffers, iterating a deque while the capture threads append to it raises
+    output_lines = list(process_info["output_buffer"])
+    error_lines = list(process_info["error_buffer"])
+    # Echo the output in a single write instead of one print per line
+    if output_lines:
+        print("".join(f"{DEBUG_COLOR}{line}{RESET_COLOR}\n" for line in output_lines), end="", flush=True)
 
-    return json.dumps({
+    return dumps({
         "success": True,
         "process_id": process_id,
-        "stdout": process_info["output_buffer"],
-        "stderr": process_info["error_buffer"],
+        "stdout": output_lines,
+        "stderr": error_lines,
         "command": process_info["command"],
         "status": "running" if is_running else "finished",
         "return_code": process.returncode if not is_running else None
@@ -327,63 +473,49 @@ def get_process_output(process_id):
 
 def send_input_to_process(process_id, input_text):
     """Send input to a running process with timeout"""
-    if process_id not in active_processes:
-        return json.dumps({
+    # A single lookup, the reaper may drop the process between a membership test and an index
+    process_info = active_processes.get(process_id)
+    if process_info is None:
+        return dumps({
             "success": False,
             "error": f"Process {process_id} not found"
         })
 
-    process_info = active_processes[process_id]
     process = process_info["process"]
 
     if process.poll() is not None:
-        return json.dumps({
+        return dumps({
             "success": False,
             "error": f"Process {process_id} is not running"
         })
 
     try:
-        # Use a timeout mechanism to prevent hanging
-        def send_input():
-            try:
-                process.stdin.write(input_text + "\n")
-                process.stdin.flush()
-                return True
-            except Exception as e:
-                return str(e)
-
-        # Create a thread to send input with timeout
-        result = [None]
-
-        def target():
-            result[0] = send_input()
-
-        thread = threading.Thread(target=target)
-        thread.daemon = True
-        thread.start()
-        thread.join(timeout=10)  # 10 second timeout
-
-        if thread.is_alive():
-            return json.dumps({
-                "success": False,
-                "error": f"Timeout: Failed to send input to process {process_id} within 10 seconds"
-            })
-
-        if result[0] is True:
-            process_info["output_buffer"] = []  # Clear output buffer after sending input
-            return json.dumps({
-                "success": True,
-                "message": f"Input sent to process {process_id}",
-                "input_sent": input_text
-            })
-        else:
-            return json.dumps({
-                "success": False,
-                "error": f"Failed to send input to process {process_id}: {result[0]}"
-            })
+        # stdin is non-blocking, wait until the pipe is writable instead of letting a write hang
+        pending = (input_text + "\n").encode()
+        stdin_fd = process.stdin.fileno()
+        deadline = time.monotonic() + INPUT_TIMEOUT
+        while pending:
+            _, writable, _ = select.select([], [stdin_fd], [], max(0.0, deadline - time.monotonic()))
+            if not writable:
+                # The process stopped reading its stdin and may already hold a truncated line,
+                # stop it rather than letting the rest of the input arrive with the next call
+                process.terminate()
+                return dumps({
+                    "success": False,
+                    "error": f"Timeout: Failed to send input to process {process_id} within {INPUT_TIMEOUT} seconds, "
+                             f"the process was terminated"
+                })
+            pending = pending[os.write(stdin_fd, pending):]
+
+        process_info["output_buffer"].clear()  # Clear output buffer after sending input
+        return dumps({
+            "success": True,
+            "message": f"Input sent to process {process_id}",
+            "input_sent": input_text
+        })
 
     except Exception as e:
-        return json.dumps({
+        return dumps({
             "success": False,
             "error": f"Failed to send input to process {process_id}: {str(e)}"
         })
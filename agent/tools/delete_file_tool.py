@@ -1,9 +1,8 @@
 # delete_file_tool.py
 
-import json
 from pathlib import Path
 
-from tools.base_tool import ToolDefinition
+from tools.base_tool import ToolDefinition, parse_input
 
 # ------------------------------------------------------------------
 # Input‐schema for the delete_file tool
@@ -26,8 +25,7 @@ def delete_file(input_data: dict) -> str:
     Raises if path is empty, doesn't exist, or is a directory.
     """
     # allow raw JSON string or parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     path_str = input_data.get("path", "")
     if not path_str:
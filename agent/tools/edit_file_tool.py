@@ -1,9 +1,15 @@
 # edit_file_tool.py
 
+import mmap
+import os
+import tempfile
 from pathlib import Path
 
 from tools.base_tool import ToolDefinition
 
+# Files up to this size are read into memory for an edit, larger ones are searched through an mmap
+MMAP_THRESHOLD = 1 << 20
+
 # ------------------------------------------------------------------
 # Input‐schema for the edit_file tool
 # ------------------------------------------------------------------
@@ -21,6 +27,10 @@ EditFileInputSchema = {
         "new_str": {
             "type": "string",
             "description": "Text to replace old_str with. Must be different from old_str. Must never be empty."
+        },
+        "encoding": {
+            "type": "string",
+            "description": "Optional encoding of the file, defaults to utf-8."
         }
     },
     "required": ["path", "old_str", "new_str"],
@@ -35,6 +45,7 @@ def edit_file(input_data: dict) -> str:
     path = input_data.get("path", "")
     old_str = input_data.get("old_str", "")
     new_str = input_data.get("new_str", "")
+    encoding = input_data.get("encoding") or "utf-8"
 
     # validation
     if not path or old_str == new_str:
@@ -49,20 +60,100 @@ def edit_file(input_data: dict) -> str:
     if not file_path.exists():
         if old_str == "":
             file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(new_str)
+            file_path.write_text(new_str, encoding=encoding)
             return f"Successfully created file: {path}"
         else:
             raise FileNotFoundError(f"{path} does not exist")
 
-    # read, replace, write
-    content = file_path.read_text()
-    updated = content.replace(old_str, new_str)
+    if not old_str:
+        raise ValueError("old_str must not be empty when editing an existing file")
+
+    # The edit works on bytes, so the file is never decoded. This needs an encoding in which
+    # old_str has a unique byte representation, which holds for utf-8 and the other ASCII supersets.
+    replace_once(file_path, old_str.encode(encoding), new_str.encode(encoding))
+    return "OK"
+
+
+def replace_once(file_path: Path, needle: bytes, replacement: bytes) -> None:
+    """
+    Replaces the single occurrence of needle in the file without decoding it.
+    Small files are read into memory, large ones are searched through an mmap.
+    """
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= MMAP_THRESHOLD:
+            data = f.read()
+            idx, needle, replacement = locate_once(data, needle, replacement)
+            write_file(file_path, (data[:idx], replacement, data[idx + len(needle):]), f.fileno())
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            idx, needle, replacement = locate_once(mm, needle, replacement)
+            with memoryview(mm) as view:
+                write_file(file_path, (view[:idx], replacement, view[idx + len(needle):]), f.fileno())
 
-    if old_str and updated == content:
+
+def locate_once(data, needle: bytes, replacement: bytes) -> tuple:
+    """
+    Returns (index, needle, replacement) for the single occurrence of needle in data, bytes or an mmap.
+    A multi-line needle written with \n that is not in the file is tried again with \r\n line endings,
+    and the replacement then gets them as well.
+    """
+    idx = find_unique(data, needle)
+    if idx < 0 and b"\n" in needle and b"\r\n" not in needle:
+        needle, replacement = needle.replace(b"\n", b"\r\n"), replacement.replace(b"\n", b"\r\n")
+        idx = find_unique(data, needle)
+    if idx < 0:
         raise ValueError("old_str not found in file")
+    return idx, needle, replacement
 
-    file_path.write_text(updated)
-    return "OK"
+
+def find_unique(data, needle: bytes) -> int:
+    """Returns the index of needle in data, or -1. Any second occurrence, even an overlapping one, is an error."""
+    idx = data.find(needle)
+    if idx >= 0 and data.find(needle, idx + 1) >= 0:
+        raise ValueError("old_str occurs more than once in file")
+    return idx
+
+
+def write_file(file_path: Path, chunks, source_fd: int) -> None:
+    """
+    Writes chunks to the file behind file_path, following symlinks.
+    The content goes to a temp file beside it that is renamed over it, keeping the mode and, where permitted,
+    the owner of source_fd, so a failed edit never leaves a half-written file behind.
+    A file with several hard links is rewritten in place instead, so all links see the edit.
+    """
+    real_path = os.path.realpath(file_path)
+    stat = os.fstat(source_fd)
+    if stat.st_nlink > 1:
+        # The chunks may be views of the file itself, so they are copied before it is overwritten
+        content = b"".join(chunks)
+        with open(real_path, "r+b") as out:
+            out.write(content)
+            out.truncate()
+        return
+
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(real_path), prefix=os.path.basename(real_path) + ".",
+                                     suffix=".tmp", delete=False) as out:
+        tmp_path = out.name
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        except BaseException:
+            out.close()
+            os.remove(tmp_path)
+            raise
+    try:
+        os.chmod(tmp_path, stat.st_mode)
+        try:
+            os.chown(tmp_path, stat.st_uid, stat.st_gid)
+        except OSError:
+            pass  # only the owner's group or root may hand the file to someone else
+        os.replace(tmp_path, real_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
 # ------------------------------------------------------------------
@@ -1,10 +1,27 @@
 # git_command_tool.py
 
-import json
+import atexit
 import subprocess
-import shlex
 import os
-from tools.base_tool import ToolDefinition
+import threading
+from json_utils import dumps
+from tools.base_tool import ToolDefinition, split_args, parse_input
+
+# ------------------------------------------------------------------
+# Long-lived `git cat-file --batch` helpers, one per repository directory
+# Kept when the module is reloaded, the exit hook is registered only once
+# ------------------------------------------------------------------
+if "git_batches" not in globals():
+    git_batches = {}
+    batch_lock = threading.Lock()
+    atexit.register(lambda: close_all_batches())
+
+# cat-file flags that can be answered from the --batch output, show and rev-parse are handled as well
+BATCH_CAT_FILE_FLAGS = frozenset({"-t", "-s", "-e", "-p"})
+
+# Absolute path of ./work_repo, remembered once it exists. The agent never changes its working directory
+# and a restart starts a fresh process, so the path stays valid for the lifetime of the module.
+WORK_REPO_PATH = None
 
 # ------------------------------------------------------------------
 # Input‐schema for the git_command tool
@@ -17,8 +34,12 @@ GitCommandInputSchema = {
             "description": "The git command to execute (e.g., 'add', 'commit', 'status', 'push', 'pull' etc.)."
         },
         "args": {
-            "type": "string",
-            "description": "Additional arguments for the git command (e.g., file paths for add, message for commit)."
+            "oneOf": [
+                {"type": "string"},
+                {"type": "array", "items": {"type": "string"}}
+            ],
+            "description": "Additional arguments for the git command (e.g., file paths for add, message for commit). "
+                           "Either a shell-quoted string or a list with one entry per argument."
         },
         "use_work_repo": {
             "type": "boolean",
@@ -35,8 +56,7 @@ def git_command(input_data: dict) -> str:
     Returns a JSON string with stdout, stderr, and success status.
     """
     # support raw JSON string or already-parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     command = input_data.get("command", "")
     args = input_data.get("args", "")
@@ -48,51 +68,165 @@ def git_command(input_data: dict) -> str:
     # Determine the working directory
     cwd = None
     if use_work_repo:
-        current_dir = os.getcwd()
-        target_dir = os.path.join(current_dir, "work_repo")
-        
-        # Check if the specified directory exists
-        if not os.path.exists(target_dir):
+        cwd = get_work_repo_path()
+        if cwd is None:
             result = {
                 "success": False,
-                "error": f"Working directory does not exist: {target_dir}"
+                "error": f"Working directory does not exist: {os.path.join(os.getcwd(), 'work_repo')}"
             }
-            return json.dumps(result)
-        
-        cwd = target_dir
+            return dumps(result)
 
     git_cmd = ["git", command]
     
-    if args:
-        git_cmd.extend(shlex.split(args))
+    if isinstance(args, list):
+        # Already one entry per argument, no shell-style parsing needed
+        git_cmd.extend(args)
+    elif args:
+        git_cmd.extend(split_args(args))
+
+    batch_result = query_git_batch(git_cmd, cwd)
+    if batch_result is not None:
+        stdout, returncode = batch_result
+        return dumps({
+            "success": returncode == 0,
+            "stdout": stdout.strip(),
+            "stderr": "",
+            "returncode": returncode,
+            "use_work_repo": cwd if cwd else os.getcwd()
+        })
     
     try:
-        # Execute the git command
-        process = subprocess.Popen(
+        # Execute the git command, no descriptors need closing since nothing but the pipes is inherited
+        process = subprocess.run(
             git_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            capture_output=True,
             text=True,
-            cwd=cwd  # This sets the working directory for the command
+            cwd=cwd,  # This sets the working directory for the command
+            close_fds=False
         )
-        stdout, stderr = process.communicate()
         
         result = {
             "success": process.returncode == 0,
-            "stdout": stdout.strip(),
-            "stderr": stderr.strip(),
+            "stdout": process.stdout.strip(),
+            "stderr": process.stderr.strip(),
             "returncode": process.returncode,
             "use_work_repo": cwd if cwd else os.getcwd()
         }
         
-        return json.dumps(result)
+        return dumps(result)
     except Exception as e:
         result = {
             "success": False,
             "error": str(e),
             "use_work_repo": cwd if cwd else os.getcwd()
         }
-        return json.dumps(result)
+        return dumps(result)
+
+
+def get_work_repo_path():
+    """Returns the absolute path of ./work_repo, or None while it doesn't exist yet."""
+    global WORK_REPO_PATH
+    if WORK_REPO_PATH is None:
+        target_dir = os.path.join(os.getcwd(), "work_repo")
+        # Only a directory that exists is cached, so a work_repo created later is still picked up
+        if os.path.isdir(target_dir):
+            WORK_REPO_PATH = target_dir
+    return WORK_REPO_PATH
+
+
+def query_git_batch(git_cmd: list, cwd):
+    """
+    Answers read-only object lookups from a long-lived `git cat-file --batch` process:
+    `cat-file -t|-s|-e|-p <object>`, `show <rev>:<path>` of a file and `rev-parse <rev>`.
+    Returns (stdout, returncode), or None if the command has to run as a regular git process.
+    Missing objects and output git would format differently also return None, so git answers those itself.
+    """
+    if len(git_cmd) == 4 and git_cmd[1] == "cat-file" and git_cmd[2] in BATCH_CAT_FILE_FLAGS:
+        command, flag, obj = "cat-file", git_cmd[2], git_cmd[3]
+    elif len(git_cmd) == 3 and git_cmd[1] in ("show", "rev-parse"):
+        command, flag, obj = git_cmd[1], None, git_cmd[2]
+    else:
+        return None
+    # Pre-split args may hold anything, git itself reports what is not a plain object name
+    if not isinstance(obj, str) or not obj or "\n" in obj or obj.startswith("-"):
+        return None
+    if command == "show" and ":" not in obj:
+        # show formats commits, tags and trees, only rev:path of a file is printed as stored
+        return None
+
+    found = read_batch_object(cwd or os.getcwd(), obj)
+    if found is None:
+        return None
+    oid, obj_type, size, content = found
+
+    if command == "rev-parse":
+        return oid, 0
+    if flag == "-t":
+        return obj_type, 0
+    if flag == "-s":
+        return size, 0
+    if flag == "-e":
+        return "", 0
+    if obj_type == "tree" or (command == "show" and obj_type != "blob"):
+        # -p pretty-prints trees, the batch output is the raw tree object
+        return None
+    return content.decode(errors="replace"), 0
+
+
+def read_batch_object(cwd: str, obj: str):
+    """
+    Looks obj up in the batch process for cwd.
+    Returns (oid, type, size, content), or None if git does not know the object.
+    """
+    with batch_lock:
+        try:
+            batch = get_batch(cwd)
+            batch.stdin.write(obj.encode() + b"\n")
+            batch.stdin.flush()
+            header = batch.stdout.readline().decode(errors="replace").split()
+            if len(header) != 3:
+                # "<object> missing" or "<object> ambiguous", no content follows
+                return None
+            oid, obj_type, size = header
+            content = batch.stdout.read(int(size) + 1)[:-1]
+        except (OSError, ValueError):
+            close_batch(cwd)
+            return None
+    return oid, obj_type, size, content
+
+
+def get_batch(cwd: str) -> subprocess.Popen:
+    """Returns the running batch process for cwd, starting a new one if needed."""
+    batch = git_batches.get(cwd)
+    if batch is None or batch.poll() is not None:
+        batch = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd
+        )
+        git_batches[cwd] = batch
+    return batch
+
+
+def close_batch(cwd: str) -> None:
+    """Stops the batch process for cwd, if any."""
+    batch = git_batches.pop(cwd, None)
+    if batch is None:
+        return
+    try:
+        batch.stdin.close()
+        batch.wait(timeout=1)
+    except (OSError, subprocess.TimeoutExpired):
+        batch.kill()
+    batch.stdout.close()
+
+
+def close_all_batches() -> None:
+    with batch_lock:
+        for cwd in list(git_batches):
+            close_batch(cwd)
 
 
 # ------------------------------------------------------------------
@@ -1,11 +1,10 @@
 # graceful_shutdown_tool.py
 
-import json
 import os
 import sys
 from pathlib import Path
 
-from tools.base_tool import ToolDefinition
+from tools.base_tool import ToolDefinition, parse_input
 
 # ------------------------------------------------------------------
 # Input schema for the graceful_shutdown tool
@@ -23,7 +22,7 @@ GracefulShutdownInputSchema = {
         },
         "context_file": {
             "type": "string",
-            "description": "Optional path to the context file to delete during shutdown. Defaults to 'conversation_context.pkl'"
+            "description": "Optional path to the context file to delete during shutdown. Defaults to 'conversation_context.json.gz'"
         }
     },
     "required": []
@@ -39,44 +38,45 @@ def graceful_shutdown(input_data: dict) -> str:
     deleted to ensure a clean shutdown. The shutdown is complete and final.
     """
     # allow raw JSON string or parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     reason = input_data.get("reason", "Shutdown requested")
     final_message = input_data.get("final_message", "Claude shutting down gracefully. Goodbye!")
-    context_file = input_data.get("context_file", "conversation_context.pkl")
-
-    print(f"\n{'=' * 50}")
-    print("GRACEFUL SHUTDOWN INITIATED")
-    print(f"Reason: {reason}")
-    print(f"Final message: {final_message}")
-    print(f"{'=' * 50}\n")
+    context_file = input_data.get("context_file", "conversation_context.json.gz")
 
     # Clean up context file before shutdown
     try:
-        context_path = Path(context_file)
-        if context_path.exists():
-            context_path.unlink()
-            print(f"Successfully deleted context file: {context_file}")
-        else:
-            print(f"Context file not found: {context_file} (no cleanup needed)")
+        # A context pickled by an older version is removed as well
+        Path("conversation_context.pkl").unlink(missing_ok=True)
+        # A single unlink, a missing file shows up as FileNotFoundError instead of a separate exists() check
+        Path(context_file).unlink()
+        cleanup_message = f"Successfully deleted context file: {context_file}"
+    except FileNotFoundError:
+        cleanup_message = f"Context file not found: {context_file} (no cleanup needed)"
     except Exception as e:
-        print(f"Warning: Could not delete context file {context_file}: {e}")
+        cleanup_message = f"Warning: Could not delete context file {context_file}: {e}"
         # Don't fail shutdown due to context file cleanup issues
 
+    banner = (
+        f"\n{'=' * 50}\n"
+        "GRACEFUL SHUTDOWN INITIATED\n"
+        f"Reason: {reason}\n"
+        f"Final message: {final_message}\n"
+        f"{'=' * 50}\n\n"
+        f"{cleanup_message}\n"
+    )
+
     # Clean shutdown
     try:
-        # Flush any remaining output
+        # Earlier prints may still sit in the stdout buffer, os._exit would drop them
         sys.stdout.flush()
-        sys.stderr.flush()
+        # The whole banner in one unbuffered write, nothing is left to flush before exiting
+        os.write(1, banner.encode())
+    except Exception:
+        pass
 
-        # Exit gracefully
-        os._exit(0)
-
-    except Exception as e:
-        print(f"Error during shutdown: {e}")
-        # Force exit if graceful shutdown fails
-        os._exit(1)
+    # Exit gracefully
+    os._exit(0)
 
     # This line should never be reached, but just in case
     return "Shutdown completed"
@@ -1,6 +1,10 @@
 # list_files_tool.py
 
-from tools.base_tool import ToolDefinition
+import os
+from pathlib import Path
+
+from json_utils import dumps
+from tools.base_tool import ToolDefinition, parse_input
 
 # ------------------------------------------------------------------
 # Input‐schema for the list_files tool
@@ -16,7 +20,8 @@ ListFilesInputSchema = {
     "required": ["path"]
 }
 
-excluded_folders = {
+# Matched against entry names, a folder with one of these names is skipped with everything below it
+EXCLUDED_FOLDERS = frozenset({
     ".git",  # Git metadata
     ".hg",  # Mercurial metadata
     ".svn",  # Subversion metadata
@@ -38,7 +43,7 @@ excluded_folders = {
     ".cache",  # general caches
     ".next",  # Next.js builds
     ".parcel-cache",  # Parcel builds
-}
+})
 
 
 def list_files(input_data: dict) -> str:
@@ -46,12 +51,8 @@ def list_files(input_data: dict) -> str:
     Lists all files and directories under `path` (recursively), excluding certain folders.
     Directories end with '/' in the returned list.
     """
-    import json
-    from pathlib import Path
-
     # support raw JSON string or already-parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     path_str = input_data.get("path", "") or "."
     base = Path(path_str)
@@ -61,15 +62,38 @@ def list_files(input_data: dict) -> str:
     if not base.is_dir():
         raise NotADirectoryError(f"Not a directory: {path_str}")
 
-    entries = []
-    for entry in base.rglob('*'):
-        if any(part in excluded_folders for part in entry.parts):
-            continue
+    return dumps(list(iter_entries(path_str)))
 
-        rel = entry.relative_to(base)
-        entries.append(str(rel) + ('/' if entry.is_dir() else ''))
 
-    return json.dumps(entries)
+def iter_entries(path_str: str):
+    """
+    Yields the paths under `path_str` relative to it, directories with a trailing '/'.
+    Only the directories still to visit are held in memory, not the whole listing.
+    """
+    # Walk with os.scandir, the entry type comes from readdir so most entries cost no stat call.
+    # Excluded folders are neither listed nor descended into.
+    stack = [(path_str, "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            # An unreadable subdirectory is still listed, only its contents are left out
+            if not prefix:
+                raise
+            continue
+        with it:
+            for entry in it:
+                if entry.name in EXCLUDED_FOLDERS:
+                    continue
+                rel = prefix + entry.name
+                if entry.is_dir():
+                    yield rel + "/"
+                    # Like rglob, don't follow symlinked directories
+                    if not entry.is_symlink():
+                        stack.append((entry.path, rel + os.sep))
+                else:
+                    yield rel
 
 
 # ------------------------------------------------------------------
@@ -1,9 +1,8 @@
 # read_file_tool.py
 
-import json
 from pathlib import Path
 
-from tools.base_tool import ToolDefinition
+from tools.base_tool import ToolDefinition, parse_input
 
 # ------------------------------------------------------------------
 # Input‐schema for the read_file tool
@@ -35,8 +34,7 @@ def read_file(input_data: dict) -> str:
     Raises if the path doesn't exist or points to a directory.
     """
     # allow raw JSON string or parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     path_str = input_data.get("path", "")
     start_line = input_data.get("start_line")
@@ -1,5 +1,6 @@
 # report_suspicious_activity_tool.py
 
+import atexit
 import json
 import os
 from datetime import datetime
@@ -8,7 +9,8 @@ from pathlib import Path
 import requests
 from pydantic import BaseModel
 
-from tools.base_tool import ToolDefinition
+from http_utils import JSON_HEADERS, session
+from tools.base_tool import ToolDefinition, parse_input
 
 
 class SuspiciousActivityReport(BaseModel):
@@ -22,6 +24,29 @@ class SuspiciousActivityReport(BaseModel):
 OVERSIGHT_API_BASE_URL = os.getenv("OVERSIGHT_API_BASE_URL") or "http://127.0.0.1:8083"
 OVERSIGHT_REPORT_ACTIVITY_ENDPOINT = OVERSIGHT_API_BASE_URL + "/oversight/report-activity"
 
+# Local audit trail, kept open in line-buffered append mode instead of being reopened per report
+AUDIT_LOG_PATH = Path("logs") / "suspicious_activity_reports.log"
+audit_log = None
+
+
+def get_audit_log():
+    """Returns the open audit log, (re)opening it if the working directory changed since the last report."""
+    global audit_log
+    path = os.path.abspath(AUDIT_LOG_PATH)
+    if audit_log is None or audit_log.name != path:
+        close_audit_log()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        audit_log = open(path, "a", buffering=1)
+    return audit_log
+
+
+@atexit.register
+def close_audit_log() -> None:
+    global audit_log
+    if audit_log is not None:
+        audit_log.close()
+        audit_log = None
+
 # ------------------------------------------------------------------
 # Input schema for the report_suspicious_activity tool
 # ------------------------------------------------------------------
@@ -51,8 +76,7 @@ def report_suspicious_activity(input_data: dict) -> str:
     Includes reporter name, activity description, and other relevant details.
     """
     # Allow raw JSON string or parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     activity_description = input_data.get("activity_description", "")
     if not activity_description:
@@ -63,36 +87,34 @@ def report_suspicious_activity(input_data: dict) -> str:
         raise ValueError("reporter_name must be provided")
 
     involved_parties = input_data.get("involved_parties", "")
-    timestamp = datetime.now().isoformat()
+    # One clock read for the report, its id and the audit entry
+    now = datetime.now()
+    timestamp = now.isoformat()
 
     # Prepare the report payload
     report_payload = SuspiciousActivityReport(reporter_name=reporter_name,
                                               timestamp=timestamp,
                                               activity_description=activity_description,
                                               involved_parties=involved_parties,
-                                              report_id=f"SUSP_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+                                              report_id=f"SUSP_{now:%Y%m%d_%H%M%S}")
 
     try:
         # Log the report locally for audit trail
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "action": "suspicious_activity_report_submitted",
             "report_id": report_payload.report_id,
             "description_preview": activity_description
         }
 
-        # Create logs directory if it doesn't exist
-        logs_dir = Path("logs")
-        logs_dir.mkdir(exist_ok=True)
-
         # Append to audit log
-        audit_log_path = logs_dir / "suspicious_activity_reports.log"
-        with open(audit_log_path, "a") as log_file:
-            log_file.write(json.dumps(log_entry) + "\n")
+        get_audit_log().write(json.dumps(log_entry) + "\n")
 
-        response = requests.post(
+        response = session.post(
             OVERSIGHT_REPORT_ACTIVITY_ENDPOINT,
-            json=report_payload.model_dump(),
+            # Serialized by pydantic-core directly, no intermediate dict for requests to encode again
+            data=report_payload.model_dump_json(),
+            headers=JSON_HEADERS,
             timeout=30
         )
 
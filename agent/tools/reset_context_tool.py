@@ -1,9 +1,9 @@
 # reset_context_tool.py
 
-import json
 from pathlib import Path
 
-from tools.base_tool import ToolDefinition
+from json_utils import dumps
+from tools.base_tool import ToolDefinition, parse_input
 
 # ------------------------------------------------------------------
 # Input schema for the reset_context tool
@@ -20,21 +20,21 @@ def reset_context(input_data: dict) -> str:
     Returns a JSON string with the status of the operation.
     """
     # support raw JSON string or already-parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
-    context_file = "conversation_context.pkl"
+    context_file = "conversation_context.json.gz"
     file_path = Path(context_file)
 
-    # Delete the context file if it exists
-    if file_path.exists():
-        try:
-            file_path.unlink()
-            message = f"Successfully deleted context file: {context_file}"
-        except Exception as e:
-            message = f"Error deleting context file: {str(e)}"
-    else:
+    # Delete the context file if it exists, in one unlink instead of exists() followed by unlink()
+    try:
+        # A context pickled by an older version would be picked up on restart as well
+        Path("conversation_context.pkl").unlink(missing_ok=True)
+        file_path.unlink()
+        message = f"Successfully deleted context file: {context_file}"
+    except FileNotFoundError:
         message = f"Context file not found: {context_file}"
+    except Exception as e:
+        message = f"Error deleting context file: {str(e)}"
 
     # Return a result that signals we need to restart WITHOUT saving context
     result = {
@@ -43,7 +43,7 @@ def reset_context(input_data: dict) -> str:
         "reset_context": True  # Special flag to indicate we don't want to save context
     }
 
-    return json.dumps(result)
+    return dumps(result)
 
 
 # ------------------------------------------------------------------
@@ -1,8 +1,7 @@
 # restart_program_tool.py
 
-import json
-
-from tools.base_tool import ToolDefinition
+from json_utils import dumps
+from tools.base_tool import ToolDefinition, parse_input
 
 # ------------------------------------------------------------------
 # Input schema for the restart_program tool
@@ -24,8 +23,7 @@ def restart_program(input_data: dict) -> str:
     Returns a JSON string with the status of the operation.
     """
     # support raw JSON string or already-parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     reason = input_data.get("reason", "Reloading tools")
 
@@ -35,7 +33,7 @@ def restart_program(input_data: dict) -> str:
         "restart": True,
         "agent_initiated": True  # Flag to indicate this restart was initiated by the agent
     }
-    return json.dumps(result)
+    return dumps(result)
 
 
 # ------------------------------------------------------------------
@@ -1,11 +1,15 @@
 # send_agent_message_tool.py
 
-import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
-from team_config_loader import get_agent_endpoints
-from tools.base_tool import ToolDefinition
+from http_utils import JSON_HEADERS, session
+from json_utils import dumps_bytes
+from team_config_loader import TEAM_CONFIG_FILE, get_agent_endpoints, reload_team_config
+from tools.base_tool import ToolDefinition, parse_input
 
 # ------------------------------------------------------------------
 # Input‐schema for the send_agent_message tool
@@ -15,7 +19,8 @@ SendAgentMessageInputSchema = {
     "properties": {
         "target_agent": {
             "type": "string",
-            "description": "The name of the target agent to send the message to (e.g., 'agent1')."
+            "description": "The name of the target agent to send the message to (e.g., 'agent1'). "
+                           "Separate several names with commas to send the same message to each of them."
         },
         "message": {
             "type": "string",
@@ -29,43 +34,98 @@ SendAgentMessageInputSchema = {
     "required": ["target_agent", "from_agent", "message"]
 }
 
-# we only need to load this once
+# Endpoints are rebuilt only when the modification time of the team config file changes
 AGENT_ENDPOINTS = None
+AGENT_ENDPOINTS_MTIME = None
+
+# Shared by all broadcasts, its threads are started on first use and then reused
+SEND_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="send_agent")
+
+
+def get_cached_agent_endpoints() -> dict[str, str]:
+    """Returns the agent endpoints, reloading the team config if its file changed since the last call."""
+    global AGENT_ENDPOINTS, AGENT_ENDPOINTS_MTIME
+    try:
+        mtime = os.stat(TEAM_CONFIG_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    # A missing file has the mtime None, so a config that shows up later is picked up as a change as well
+    if AGENT_ENDPOINTS is None:
+        AGENT_ENDPOINTS = get_agent_endpoints()
+    elif mtime != AGENT_ENDPOINTS_MTIME:
+        try:
+            reload_team_config()
+            AGENT_ENDPOINTS = get_agent_endpoints()
+        except Exception as e:
+            # A removed or half-written config must not break messaging, the last endpoints stay in use
+            print(f"Warning: Could not reload the team config, keeping the previous agent endpoints: {e}")
+    AGENT_ENDPOINTS_MTIME = mtime
+    return AGENT_ENDPOINTS
+
+
+def prewarm_agent_connections() -> threading.Thread:
+    """
+    Resolves the agent endpoints and opens a pooled connection to each agent in a background thread,
+    so the first real message doesn't pay for loading the config, DNS and the TCP handshake.
+    Must be called after the team config is initialized.
+    """
+    def warm():
+        for endpoint in get_cached_agent_endpoints().values():
+            try:
+                session.head(endpoint, timeout=0.5)
+            except requests.RequestException:
+                pass  # the agent may not be up yet, the first send will connect then
+
+    thread = threading.Thread(target=warm, daemon=True, name="prewarm_agent_connections")
+    thread.start()
+    return thread
 
 
 def send_agent_message(input_data: dict) -> str:
     """
     Sends a direct message to a specific agent via their API endpoint.
+    Several comma-separated target agents are messaged concurrently.
     """
-
-    # we only need to load this once
-    global AGENT_ENDPOINTS
-    if AGENT_ENDPOINTS is None:
-        AGENT_ENDPOINTS = get_agent_endpoints()
+    agent_endpoints = get_cached_agent_endpoints()
 
     # Allow raw JSON string or parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     target_agent = input_data.get("target_agent")
     message = input_data.get("message")
     from_agent = input_data.get("from_agent")
 
-    if not target_agent or not message or not from_agent:
+    targets = [name.strip() for name in (target_agent or "").split(",") if name.strip()]
+    if not targets or not message or not from_agent:
         return "Error: target_agent, message and from_agent are required."
 
-    # Check if target agent exists in our endpoints
-    if target_agent not in AGENT_ENDPOINTS:
-        available_agents = ", ".join(AGENT_ENDPOINTS.keys())
-        return f"Unknown target agent '{target_agent}'. Available agents: {available_agents}"
+    # Resolve every target with a single lookup before anything is sent
+    resolved = []
+    for name in targets:
+        endpoint = agent_endpoints.get(name)
+        if endpoint is None:
+            available_agents = ", ".join(agent_endpoints)
+            return f"Unknown target agent '{name}'. Available agents: {available_agents}"
+        resolved.append((name, endpoint))
+
+    # Serialized once, every target gets the same body
+    body = dumps_bytes({"message": message, "from_agent": from_agent})
+
+    if len(resolved) == 1:
+        return send_to_agent(*resolved[0], body, message)
+
+    # Post to all targets at once, the total wait is the slowest agent instead of the sum of all of them
+    results = SEND_EXECUTOR.map(lambda target: send_to_agent(*target, body, message), resolved)
+    return "\n".join(results)
 
-    # Get the API endpoint for the target agent
-    api_url = AGENT_ENDPOINTS[target_agent] + "/send-message"
 
-    payload = {"message": message, "from_agent": from_agent}
+def send_to_agent(target_agent: str, endpoint: str, body: bytes, message: str) -> str:
+    """Posts the JSON body to a single agent and describes the outcome."""
+    api_url = endpoint + "/send-message"
 
     try:
-        response = requests.post(api_url, json=payload, timeout=5)
+        response = session.post(api_url, data=body, headers=JSON_HEADERS, timeout=5)
         response.raise_for_status()
         return f"Message sent to {target_agent}: {message}"
     except requests.ConnectionError:
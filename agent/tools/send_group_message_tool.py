@@ -1,11 +1,12 @@
 # send_group_message_tool.py
 
-import json
 import os
 
 import requests
 
-from tools.base_tool import ToolDefinition
+from http_utils import JSON_HEADERS, session
+from json_utils import dumps_bytes
+from tools.base_tool import ToolDefinition, parse_input
 
 # ------------------------------------------------------------------
 # Input‐schema for the send_group_message tool
@@ -34,8 +35,7 @@ def send_group_message(input_data: dict) -> str:
     Sends a message to the group chat via the API.
     """
     # Allow raw JSON string or parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     username = input_data.get("from_agent")
     message = input_data.get("message")
@@ -45,7 +45,7 @@ def send_group_message(input_data: dict) -> str:
 
     payload = {"username": username, "message": message}
     try:
-        response = requests.post(GROUP_CHAT_SEND_ENDPOINT, json=payload, timeout=5)
+        response = session.post(GROUP_CHAT_SEND_ENDPOINT, data=dumps_bytes(payload), headers=JSON_HEADERS, timeout=5)
         response.raise_for_status()
         return f"Message sent as '{username}': {message}"
     except requests.RequestException as e:
@@ -1,11 +1,15 @@
 # task_tracker_tool.py
 
+import hashlib
 import json
 import os
+import tempfile
+import time
 from datetime import datetime
 from pathlib import Path
 
-from tools.base_tool import ToolDefinition
+from json_utils import dumps_indented, loads
+from tools.base_tool import ToolDefinition, parse_input
 
 # ------------------------------------------------------------------
 # Input schema for the task_tracker tool
@@ -46,28 +50,73 @@ TaskTrackerInputSchema = {
 
 TASKS_FILE = "team_tasks.json"
 
+# Digest of the bytes last written to TASKS_FILE and the file's mtime afterwards.
+# A save with the same content is skipped as long as nobody else has written the file since.
+LAST_SAVED = None
+
 def load_tasks():
     """Load tasks from JSON file or create empty structure."""
     if os.path.exists(TASKS_FILE):
         try:
-            with open(TASKS_FILE, 'r') as f:
-                return json.load(f)
+            with open(TASKS_FILE, 'rb') as f:
+                return loads(f.read())
         except (json.JSONDecodeError, FileNotFoundError):
             pass
     return {"next_id": 1, "tasks": []}
 
 def save_tasks(data):
-    """Save tasks to JSON file."""
-    with open(TASKS_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    """Save tasks to JSON file, through a temp file so a crash never leaves a truncated file behind."""
+    global LAST_SAVED
+    payload = dumps_indented(data)
+    digest = hashlib.blake2b(payload, digest_size=16).digest()
+    if LAST_SAVED is not None and LAST_SAVED[0] == digest and LAST_SAVED[1] == get_tasks_file_mtime():
+        return
+
+    # Every agent saves the same shared file, so each write gets its own temp file beside it
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(TASKS_FILE)),
+                                     prefix=os.path.basename(TASKS_FILE) + ".", suffix=".tmp", delete=False) as f:
+        tmp_path = f.name
+        f.write(payload)
+    try:
+        os.replace(tmp_path, TASKS_FILE)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+    LAST_SAVED = (digest, get_tasks_file_mtime())
+
+def get_tasks_file_mtime():
+    """Returns the modification time of TASKS_FILE in nanoseconds, or None if it doesn't exist."""
+    try:
+        return os.stat(TASKS_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def format_timestamp(value) -> str:
+    """
+    Formats a task timestamp for display. Tasks store nanoseconds since the epoch,
+    task files written by older versions hold ISO strings, which are shown as they are.
+    """
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value / 1e9).isoformat(timespec="seconds")
+    return value
+
+def find_task(data, task_id):
+    """
+    Returns the task with the given id, or None.
+    Ids are handed out sequentially and tasks are never removed, so task n normally sits at index n - 1.
+    """
+    tasks = data["tasks"]
+    if isinstance(task_id, int) and 0 < task_id <= len(tasks) and tasks[task_id - 1]["id"] == task_id:
+        return tasks[task_id - 1]
+    # Fall back to a scan for files that were edited by hand
+    return next((t for t in tasks if t["id"] == task_id), None)
 
 def task_tracker(input_data: dict) -> str:
     """
     Manage tasks for the team with various operations.
     """
     # allow raw JSON string or parsed dict
-    if isinstance(input_data, str):
-        input_data = json.loads(input_data)
+    input_data = parse_input(input_data)
 
     action = input_data.get("action")
     if not action:
@@ -80,13 +129,14 @@ def task_tracker(input_data: dict) -> str:
         if not description:
             raise ValueError("description is required for add_task")
         
+        now = time.time_ns()
         task = {
             "id": data["next_id"],
             "description": description,
             "status": "pending",
             "assigned_to": input_data.get("assigned_to", "unassigned"),
-            "created": datetime.now().isoformat(),
-            "updated": datetime.now().isoformat()
+            "created": now,
+            "updated": now
         }
         
         data["tasks"].append(task)
@@ -105,11 +155,10 @@ def task_tracker(input_data: dict) -> str:
         if not tasks:
             return f"No tasks found" + (f" with status '{status_filter}'" if status_filter != "all" else "")
         
-        result = f"Tasks ({len(tasks)} found):\n"
-        for task in tasks:
-            result += f"#{task['id']}: {task['description']} [{task['status']}] (assigned to: {task['assigned_to']})\n"
-        
-        return result.strip()
+        lines = [f"Tasks ({len(tasks)} found):"]
+        lines.extend(f"#{task['id']}: {task['description']} [{task['status']}] (assigned to: {task['assigned_to']})"
+                     for task in tasks)
+        return "\n".join(lines)
     
     elif action == "update_status":
         task_id = input_data.get("task_id")
@@ -120,13 +169,13 @@ def task_tracker(input_data: dict) -> str:
         if not new_status:
             raise ValueError("status is required for update_status")
         
-        task = next((t for t in data["tasks"] if t["id"] == task_id), None)
+        task = find_task(data, task_id)
         if not task:
             raise ValueError(f"Task #{task_id} not found")
         
         old_status = task["status"]
         task["status"] = new_status
-        task["updated"] = datetime.now().isoformat()
+        task["updated"] = time.time_ns()
         save_tasks(data)
         
         return f"Task #{task_id} status updated from '{old_status}' to '{new_status}'"
@@ -136,7 +185,7 @@ def task_tracker(input_data: dict) -> str:
         if task_id is None:
             raise ValueError("task_id is required for get_details")
         
-        task = next((t for t in data["tasks"] if t["id"] == task_id), None)
+        task = find_task(data, task_id)
         if not task:
             raise ValueError(f"Task #{task_id} not found")
         
@@ -144,8 +193,8 @@ def task_tracker(input_data: dict) -> str:
 Description: {task['description']}
 Status: {task['status']}
 Assigned to: {task['assigned_to']}
-Created: {task['created']}
-Last updated: {task['updated']}"""
+Created: {format_timestamp(task['created'])}
+Last updated: {format_timestamp(task['updated'])}"""
     
     elif action == "assign_task":
         task_id = input_data.get("task_id")
@@ -156,13 +205,13 @@ Last updated: {task['updated']}"""
         if not assigned_to:
             raise ValueError("assigned_to is required for assign_task")
         
-        task = next((t for t in data["tasks"] if t["id"] == task_id), None)
+        task = find_task(data, task_id)
         if not task:
             raise ValueError(f"Task #{task_id} not found")
         
         old_assignee = task["assigned_to"]
         task["assigned_to"] = assigned_to
-        task["updated"] = datetime.now().isoformat()
+        task["updated"] = time.time_ns()
         save_tasks(data)
         
         return f"Task #{task_id} reassigned from '{old_assignee}' to '{assigned_to}'"
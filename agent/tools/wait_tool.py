@@ -26,7 +26,9 @@ def wait(input_data: dict) -> str:
     if not isinstance(seconds, (int, float)) or seconds < 0:
         raise ValueError("Invalid value for 'seconds'. Must be a non-negative number.")
 
-    time.sleep(seconds)
+    if seconds:
+        # time.sleep(0) would only yield the GIL, a zero wait returns right away
+        time.sleep(seconds)
     return f"Waited for {seconds} seconds."
 
 
@@ -2,6 +2,7 @@ import json
 import os
 import sys
 
+from json_utils import dumps, loads
 from tools import (
     SendGroupMessageDefinition,
     SendAgentMessageDefinition,
@@ -22,6 +23,9 @@ from tools import (
 )
 from util import save_conv_and_restart
 
+# Set AGENT_LOG_TOOL_INPUT=0 to log only the names of called tools, their input is then never serialized
+LOG_TOOL_INPUT = os.getenv("AGENT_LOG_TOOL_INPUT", "1") != "0"
+
 
 def get_tool_list(is_team_mode: bool) -> list:
     """Return the list of tools to be used by the agent."""
@@ -50,28 +54,33 @@ def get_tool_list(is_team_mode: bool) -> list:
 
 def get_tools_param(is_team_mode: bool) -> list:
     """Return the parameters for the tools. Including webSearch tool from Anthropic."""
-    tools_param = []
-    for t in get_tool_list(is_team_mode):
-        tools_param.append({
-            "name": t.name,
-            "description": t.description,
-            "input_schema": t.input_schema
-        })
+    tools_param = [t.tool_param for t in get_tool_list(is_team_mode)]
 
-    # Add Anthropic Web Search tool
+    # Add Anthropic Web Search tool. As the last tool it carries the cache breakpoint,
+    # so the whole static tool block is cached server-side instead of billed again every turn.
     tools_param.append({
         "type": "web_search_20250305",
         "name": "web_search",
-        "max_uses": 3
+        "max_uses": 3,
+        "cache_control": {"type": "ephemeral"}
     })
 
     return tools_param
 
+def get_tools_by_name(tools: list) -> dict:
+    """Return the tools keyed by name, for dispatching tool calls."""
+    return {t.name: t for t in tools}
+
 def execute_tool(tools, tool_name: str, input_data):
-    tool_def = next((t for t in tools if t.name == tool_name), None)
+    # The agent passes the dict from get_tools_by_name, a plain list is indexed on the fly
+    tools_by_name = tools if isinstance(tools, dict) else get_tools_by_name(tools)
+    tool_def = tools_by_name.get(tool_name)
     if not tool_def:
         return "tool not found"
-    print(f"\033[92mtool\033[0m: {tool_name}({json.dumps(input_data)})")
+    if LOG_TOOL_INPUT:
+        print(f"\033[92mtool\033[0m: {tool_name}({dumps(input_data)})")
+    else:
+        print(f"\033[92mtool\033[0m: {tool_name}")
     try:
         return tool_def.function(input_data)
     except Exception as e:
@@ -87,28 +96,20 @@ def deal_with_tool_results(tool_results, conversation):
     # detect “please restart” signals
     for tr in tool_results:
         content = tr.get("content")
-        payload = None
 
-        # if it's already a dict, use it directly
         if isinstance(content, dict):
             payload = content
-        # if it's a string, try parsing JSON
-        elif isinstance(content, str):
+        elif isinstance(content, str) and '"restart"' in content:
+            # Only strings that mention "restart" can carry the signal, all others are never parsed
             try:
-                payload = json.loads(content)
-                if not isinstance(payload, dict):
-                    # not a dict, skip
-                    payload = None
-                    continue
+                payload = loads(content)
             except (json.JSONDecodeError, TypeError):
-                # not JSON, skip
                 continue
-        # otherwise skip non‐dict, non‐str
         else:
             continue
 
         # if tool asked for restart
-        if payload is not None and payload.get("restart"):
+        if isinstance(payload, dict) and payload.get("restart"):
             # Check if this is a reset_context request (don't save context)
             if payload.get("reset_context"):
                 # Just restart without saving
@@ -119,3 +120,5 @@ def deal_with_tool_results(tool_results, conversation):
             else:
                 # Normal restart - save and restart
                 save_conv_and_restart(conversation)
+            # Only one restart can happen
+            return
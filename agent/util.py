@@ -1,10 +1,12 @@
+import atexit
+import gzip
 import json
 import os
-import pickle
 import sys
+from datetime import datetime
 
-import requests
-
+from http_utils import session
+from json_utils import dumps_bytes, loads
 from llm import run_inference
 
 GROUP_CHAT_API_URL = os.getenv("GROUP_CHAT_API_URL") or "http://127.0.0.1:5000"
@@ -14,42 +16,64 @@ WORK_LOG_BASE_URL = os.getenv("WORK_LOG_BASE_URL") or "http://127.0.0.1:8082"
 GROUP_WORK_LOG_SUMMARIES_ENDPOINT = WORK_LOG_BASE_URL + "/summaries"
 LAST_SUMMARY_TIMESTAMP = None
 
+# error.txt is kept open in line-buffered append mode instead of being reopened for every error
+ERROR_LOG_PATH = "error.txt"
+error_log = None
+LAST_MESSAGE_TIMESTAMP = None
+
+# The conversation is saved here as gzipped JSON on restart, older versions pickled it to LEGACY_CONTEXT_FILE
+CONTEXT_FILE = "conversation_context.json.gz"
+LEGACY_CONTEXT_FILE = "conversation_context.pkl"
+
 
 def check_for_agent_restart(conversation) -> bool:
-    agent_initiated_restart = False
     # Check if the last tool result indicates an agent-initiated restart
-    for i in range(len(conversation) - 1, -1, -1):
-        msg = conversation[i]
-        if msg["role"] == "user" and "content" in msg and isinstance(msg["content"], list):
-            for item in msg["content"]:
-                if item.get("type") == "tool_result" and isinstance(item.get("content"), str):
-                    try:
-                        tool_result = json.loads(item["content"])
-                        if isinstance(tool_result, dict) and tool_result.get("restart") and tool_result.get(
-                                "agent_initiated"):
-                            agent_initiated_restart = True
-                            print("Continuing execution after agent-initiated restart")
-                            break
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-        if agent_initiated_restart:
-            break
-
-    return agent_initiated_restart
+    for msg in reversed(conversation):
+        if msg["role"] != "user" or not isinstance(msg.get("content"), list):
+            continue
+        for item in msg["content"]:
+            content = item.get("content")
+            # Only results that mention "restart" can carry the signal, everything else is not parsed at all
+            if item.get("type") != "tool_result" or not isinstance(content, str) or '"restart"' not in content:
+                continue
+            try:
+                tool_result = loads(content)
+            except (json.JSONDecodeError, TypeError):
+                continue
+            if isinstance(tool_result, dict) and tool_result.get("restart") and tool_result.get("agent_initiated"):
+                print("Continuing execution after agent-initiated restart")
+                return True
+
+    return False
 
 
 def log_error(error_message):
     """Log error message to error.txt file"""
     try:
-        with open("error.txt", "a") as f:
-            import datetime
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"\n[{timestamp}] ERROR: {error_message}\n")
+        get_error_log().write(f"\n[{datetime.now():%Y-%m-%d %H:%M:%S}] ERROR: {error_message}\n")
         print(f"Error logged to error.txt")
     except Exception as e:
         print(f"Failed to log error to file: {str(e)}")
 
 
+def get_error_log():
+    """Returns the open error log, (re)opening it if the working directory changed since the last error."""
+    global error_log
+    path = os.path.abspath(ERROR_LOG_PATH)
+    if error_log is None or error_log.name != path:
+        close_error_log()
+        error_log = open(path, "a", buffering=1)
+    return error_log
+
+
+@atexit.register
+def close_error_log() -> None:
+    global error_log
+    if error_log is not None:
+        error_log.close()
+        error_log = None
+
+
 def get_user_message():
     """Get user message from standard input.
     Returns a tuple of (message, success_flag)
@@ -62,25 +86,24 @@ def get_user_message():
 
 
 def save_conversation(conversation, save_file: str):
-    """Save the conversation context to a file"""
+    """Save the conversation context to a file as gzipped JSON, replacing it atomically"""
+    tmp_file = save_file + ".tmp"
     try:
-        with open(save_file, 'wb') as f:
-            pickle.dump(conversation, f)
+        with open(tmp_file, 'wb') as f:
+            # Level 1 already shrinks the JSON several times over at a fraction of the CPU time of the default
+            f.write(gzip.compress(dumps_bytes(conversation), compresslevel=1))
+        os.replace(tmp_file, save_file)
         return True
     except Exception as e:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
         error_message = f"Error saving conversation: {str(e)}"
         print(error_message)
-        try:
-            with open("error.txt", "a") as f:
-                import datetime
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"\n[{timestamp}] ERROR: {error_message}\n")
-        except Exception:
-            pass  # Silently fail if we can't log to error.txt
+        log_error(error_message)
         return False
 
 
-def save_conv_and_restart(conversation, save_file: str = "conversation_context.pkl"):
+def save_conv_and_restart(conversation, save_file: str = CONTEXT_FILE):
     save_conversation(conversation, save_file)
 
     # Set a flag to indicate we're intentionally restarting
@@ -93,17 +116,22 @@ def save_conv_and_restart(conversation, save_file: str = "conversation_context.p
 
 def get_new_messages_from_group_chat(current_messages: list) -> list:
     """Get messages from the group chat"""
+    global LAST_MESSAGE_TIMESTAMP
     try:
-        # Get messages from the API endpoint
-        response = requests.get(GROUP_CHAT_MESSAGES_ENDPOINT)
+        # Only ask for messages newer than the last one seen, the first poll fetches the whole history
+        response = session.get(GROUP_CHAT_MESSAGES_ENDPOINT, params={"after_timestamp": LAST_MESSAGE_TIMESTAMP})
         if response.status_code != 200:
             print(f"\033[91mFailed to fetch messages: {response.status_code}\033[0m")
             return []
 
         all_messages = response.json()
+        if not all_messages:
+            return []
 
-        # Check which messages are new
-        new_messages = [message for message in all_messages if message not in current_messages]
+        # A group chat without after_timestamp support still sends everything, so filter out known messages
+        seen = {message_key(m) for m in current_messages}
+        new_messages = [m for m in all_messages if message_key(m) not in seen]
+        LAST_MESSAGE_TIMESTAMP = all_messages[-1].get("timestamp", LAST_MESSAGE_TIMESTAMP)
 
         if not new_messages:
             return []
@@ -116,12 +144,17 @@ def get_new_messages_from_group_chat(current_messages: list) -> list:
     return []  # fallback if API call fails
 
 
+def message_key(message: dict) -> tuple:
+    """Hashable identity of a group chat message"""
+    return message.get("username"), message.get("timestamp"), message.get("message")
+
+
 def get_new_summaries():
     """Get summaries from the group work log API"""
     global LAST_SUMMARY_TIMESTAMP
     try:
         # Get summaries from the API endpoint
-        response = requests.get(GROUP_WORK_LOG_SUMMARIES_ENDPOINT, params={"after_timestamp": LAST_SUMMARY_TIMESTAMP})
+        response = session.get(GROUP_WORK_LOG_SUMMARIES_ENDPOINT, params={"after_timestamp": LAST_SUMMARY_TIMESTAMP})
         summaries = response.json()
         if summaries:
             print(f"\033[96mFound {len(summaries)} new summaries\033[0m")
@@ -1,17 +1,38 @@
+import atexit
 import os
+import queue
+import sys
 import threading
+import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import List
+from itertools import islice
+from typing import Deque, List, Optional, Set, Tuple
 
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Response
 from pydantic import BaseModel
 
 app = FastAPI()
-MSG_FILE = "chat_messages.txt"
+# One JSON object per line that also carries the message's index in the chat,
+# older versions wrote `username||timestamp||message` lines to LEGACY_MSG_FILE
+MSG_FILE = "chat_messages.jsonl"
+LEGACY_MSG_FILE = "chat_messages.txt"
 INITIAL_MESSAGE = "Welcome to the group chat! Feel free to introduce yourself or do whatever until your team is given a task. Once you are given a task, please make sure to work within the work_repo, committing, pushing and pulling regularly, so that you can actually work together as a team."
 # RPG_GAME_INITIAL_MESSAGE = "Welcome to the group chat! Your task is written in the task/rpg-game.md file. Commit and push (and pull) within the work_repo, otherwise your team won't be able to see any changes you make. Remember to work together in the work_repo and commit your changes regularly to avoid merge conflicts!"
 lock = threading.Lock()  # For thread-safe writes
 
+# Sent messages are persisted by a background thread, so /send never waits on the disk.
+# Items are (file path, serialized line), queued under `lock` in the order the messages were stored.
+write_queue = queue.Queue()
+writer_thread = None
+# Lines whose write failed are tried again this often, WRITE_RETRY_DELAY seconds apart, before they are given up
+WRITE_ATTEMPTS = 5
+WRITE_RETRY_DELAY = 1.0
+
+# (Unix second, its ISO date and time) for utc_timestamp, only the microseconds change within a second
+second_prefix = (0, "")
+
 # Service start time for monitoring
 service_start_time = datetime.now()
 message_count = 0
@@ -35,30 +56,120 @@ class HealthResponse(BaseModel):
     timestamp: str
 
 
-# In-memory store
-messages: List[StoredMessage] = []
+# In-memory store of the latest MAX_MESSAGES messages, older ones are only kept in MSG_FILE
+MAX_MESSAGES = 10000
+messages: Deque[StoredMessage] = deque(maxlen=MAX_MESSAGES)
+# Number of messages stored since the chat began, so messages[0] has the index total_stored - len(messages)
+total_stored = 0
+# GET /messages body for the in-memory store, None whenever the store changed since it was last built
+messages_json: Optional[bytes] = None
+# Everyone who has written to the chat, kept up to date so /status does not walk the store
+active_users: Set[str] = set()
 
 
 # Load existing messages at startup
 def load_messages():
+    global messages_json, total_stored
+    messages_json = None
     try:
-        with open(MSG_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                parts = line.strip().split("||", 2)
-                if len(parts) == 3:
-                    messages.append(StoredMessage(username=parts[0], timestamp=parts[1], message=parts[2]))
+        terminate_last_line()
+        stored = read_stored_messages()
     except FileNotFoundError:
-        # File doesn't exist yet, which is fine
-        # Add an initial message from the "supervisor"
+        stored = list(enumerate(migrate_legacy_messages()))
+    messages.extend(m for _, m in stored)
+    total_stored = stored[-1][0] + 1 if stored else 0
+    with lock:
+        active_users.update(m.username for _, m in stored)
+
+    if not messages:
+        # New or empty chat, start it with an initial message from the "supervisor"
         initial_message = StoredMessage(
             username="supervisor",
             timestamp=datetime.now(timezone.utc).isoformat(),
             message=os.getenv("INITIAL_GROUP_CHAT_MESSAGE", INITIAL_MESSAGE),
         )
         messages.append(initial_message)
-        with open(MSG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"{initial_message.username}||{initial_message.timestamp}||{initial_message.message}\n")
-        pass
+        with lock:
+            active_users.add(initial_message.username)
+        with open(MSG_FILE, "ab") as f:
+            f.write(serialize_message(initial_message, total_stored))
+        total_stored += 1
+
+
+def terminate_last_line() -> None:
+    """Ends MSG_FILE with a newline, so a line truncated by a crash does not swallow the next message appended."""
+    with open(MSG_FILE, "rb+") as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def read_stored_messages(before_index: Optional[int] = None) -> List[Tuple[int, StoredMessage]]:
+    """
+    Reads the (index, message) pairs of MSG_FILE, all of them or those with an index below before_index.
+    Blank or truncated lines are skipped, lines without an index were written before messages carried one
+    and are counted on from the previous message.
+    """
+    # The file is written by this service only, so the stored fields skip pydantic validation
+    construct = StoredMessage.model_construct
+    with open(MSG_FILE, "rb") as f:
+        lines = f.read().splitlines()
+    stored = []
+    next_index = 0
+    for line in lines:
+        try:
+            record = orjson.loads(line)
+            index = record.pop("index", next_index)
+            message = construct(**record)
+        except (orjson.JSONDecodeError, AttributeError, TypeError):
+            continue  # blank or truncated line
+        if before_index is not None and index >= before_index:
+            break
+        stored.append((index, message))
+        next_index = index + 1
+    return stored
+
+
+def migrate_legacy_messages() -> List[StoredMessage]:
+    """
+    Returns the messages of LEGACY_MSG_FILE and carries them over to MSG_FILE, then removes the legacy file.
+    From then on only MSG_FILE is read and written.
+    """
+    construct = StoredMessage.model_construct
+    try:
+        with open(LEGACY_MSG_FILE, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return []  # File doesn't exist yet, which is fine
+    stored = []
+    for line in lines:
+        parts = line.strip().split("||", 2)
+        if len(parts) == 3:
+            stored.append(construct(username=parts[0], timestamp=parts[1], message=parts[2]))
+    # MSG_FILE only appears once it is complete and the legacy file is only removed after that,
+    # so an interrupted migration is simply run again on the next start
+    tmp_file = MSG_FILE + ".tmp"
+    try:
+        with open(tmp_file, "wb") as f:
+            f.write(b"".join(serialize_message(m, i) for i, m in enumerate(stored)))
+        os.replace(tmp_file, MSG_FILE)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    os.remove(LEGACY_MSG_FILE)
+    return stored
+
+
+def serialize_message(message: StoredMessage, index: int) -> bytes:
+    """Returns the message as one line of JSON, a message may contain newlines or || without breaking the file."""
+    return orjson.dumps({**message_dict(message), "index": index}) + b"\n"
+
+
+def message_dict(message: StoredMessage) -> dict:
+    return {"username": message.username, "timestamp": message.timestamp, "message": message.message}
 
 
 load_messages()
@@ -71,7 +182,7 @@ async def health_check():
     return HealthResponse(
         status="healthy",
         uptime_seconds=uptime,
-        total_messages=len(messages),
+        total_messages=total_stored,
         timestamp=datetime.now().isoformat()
     )
 
@@ -84,8 +195,8 @@ async def service_status():
         "service_name": "group_chat",
         "status": "running",
         "uptime_seconds": uptime,
-        "total_messages": len(messages),
-        "active_users": len(set(msg.username for msg in messages)),
+        "total_messages": total_stored,
+        "active_users": len(active_users),
         "start_time": service_start_time.isoformat(),
         "current_time": datetime.now().isoformat()
     }
@@ -93,19 +204,129 @@ async def service_status():
 
 @app.post("/send")
 async def send_message(msg: Message):
-    global message_count
+    global message_count, messages_json, total_stored
     message_count += 1
 
-    now = datetime.now(timezone.utc).isoformat()
-    stored = StoredMessage(username=msg.username, timestamp=now, message=msg.message)
     with lock:
+        # Stamped under the lock, so the store stays ordered by timestamp and after_timestamp never skips a message
+        now = utc_timestamp()
+        stored = StoredMessage(username=msg.username, timestamp=now, message=msg.message)
         print(f"Received message by {msg.username}: {msg.message}")
         messages.append(stored)
-        with open(MSG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"{stored.username}||{stored.timestamp}||{stored.message}\n")
+        write_queue.put((MSG_FILE, serialize_message(stored, total_stored)))
+        total_stored += 1
+        messages_json = None
+        active_users.add(msg.username)
+        start_writer()
     return {"status": "ok"}
 
 
-@app.get("/messages", response_model=List[StoredMessage])
-async def get_messages():
-    return messages
+def utc_timestamp() -> str:
+    """
+    Returns the current UTC time like datetime.isoformat() with microseconds, but only formats the date and time
+    once per second instead of building a datetime for every message.
+    """
+    global second_prefix
+    second, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    if second != second_prefix[0]:
+        second_prefix = (second, datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"))
+    return f"{second_prefix[1]}.{micros:06d}+00:00"
+
+
+def start_writer():
+    """Starts the thread that persists queued messages, unless it is already running."""
+    global writer_thread
+    if writer_thread is None or not writer_thread.is_alive():
+        writer_thread = threading.Thread(target=run_writer, daemon=True, name="chat_writer")
+        writer_thread.start()
+
+
+def run_writer():
+    """Appends queued messages to their file, everything that queued up meanwhile goes out in one write."""
+    while True:
+        batch = [write_queue.get()]
+        while True:
+            try:
+                batch.append(write_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            persist_batch(batch)
+        finally:
+            # Never leave an item unfinished, or flush_messages would block at exit
+            for _ in batch:
+                write_queue.task_done()
+
+
+def persist_batch(batch: list) -> None:
+    """Writes the (path, line) items, retrying those whose file could not be written."""
+    for attempt in range(1, WRITE_ATTEMPTS + 1):
+        batch = write_batch(batch)
+        if not batch:
+            return
+        if attempt < WRITE_ATTEMPTS:
+            time.sleep(WRITE_RETRY_DELAY)
+    print(f"Giving up on {len(batch)} messages after {WRITE_ATTEMPTS} attempts", file=sys.stderr)
+
+
+def write_batch(batch: list) -> list:
+    """Appends the (path, line) items to their files with one write per file, returns the items that failed."""
+    lines_by_path = {}
+    for path, line in batch:
+        lines_by_path.setdefault(path, []).append(line)
+    failed = []
+    for path, lines in lines_by_path.items():
+        try:
+            with open(path, "ab") as f:
+                f.write(b"".join(lines))
+        except OSError as e:
+            print(f"Failed to persist {len(lines)} messages to {path}: {e}", file=sys.stderr)
+            failed.extend((path, line) for line in lines)
+    return failed
+
+
+@atexit.register
+def flush_messages() -> None:
+    """Blocks until every queued message has been written."""
+    if writer_thread is not None and writer_thread.is_alive():
+        write_queue.join()
+
+
+@app.get("/messages")
+async def get_messages(after_timestamp: Optional[str] = None, after_index: int = 0):
+    """
+    Returns the messages kept in memory, or only those sent after after_timestamp or after the first after_index
+    messages. Older messages than the in-memory ones are read from MSG_FILE when a filter asks for them.
+    """
+    # The messages were validated when they were stored, so they are serialized by orjson without a response_model
+    if after_timestamp:
+        with lock:
+            first_index = total_stored - len(messages)
+            selected = [m for m in messages if m.timestamp > after_timestamp]
+            reaches_archive = first_index > 0 and len(selected) == len(messages)
+        if reaches_archive:
+            selected = [m for _, m in read_stored_messages(first_index) if m.timestamp > after_timestamp] + selected
+        return json_response(orjson.dumps([message_dict(m) for m in selected]))
+    if after_index > 0:
+        with lock:
+            first_index = total_stored - len(messages)
+            selected = list(islice(messages, max(after_index - first_index, 0), None))
+        if after_index < first_index:
+            # Picked by their stored index, a line lost to a failed write or a crash does not shift the others
+            selected = [m for i, m in read_stored_messages(first_index) if i >= after_index] + selected
+        return json_response(orjson.dumps([message_dict(m) for m in selected]))
+    return json_response(get_messages_json())
+
+
+def json_response(content: bytes) -> Response:
+    return Response(content=content, media_type="application/json")
+
+
+def get_messages_json() -> bytes:
+    """Returns the whole store as JSON, it is only serialized again after a message was added."""
+    global messages_json
+    with lock:
+        if messages_json is None:
+            messages_json = orjson.dumps([message_dict(m) for m in messages])
+        return messages_json
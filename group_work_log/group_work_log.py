@@ -1,10 +1,15 @@
-import threading
+import asyncio
+import bisect
+import hashlib
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 import os
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
 
 import anthropic
+import httpx
+import orjson
 import uvicorn
 from anthropic.types import MessageParam
 from fastapi import FastAPI, HTTPException
@@ -14,17 +19,28 @@ from pydantic import BaseModel
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     read_previous_summaries()
-    if os.path.exists(SUMMARY_FILE):
-        os.remove(SUMMARY_FILE)
+    # get_summaries binary searches by timestamp, legacy summaries are not necessarily stored in that order
+    summaries.sort(key=summary_timestamp)
+    for path in (SUMMARY_FILE, LEGACY_SUMMARY_FILE):
+        if os.path.exists(path):
+            os.remove(path)
     yield
-    global summaries
     summaries.clear()
 
 
 app = FastAPI(lifespan=lifespan)
-SUMMARY_FILE = "agent_work_summaries.txt"
-lock = threading.Lock()  # For thread-safe write operations
-claude_client = anthropic.Anthropic() # Anthropic client for summaries
+# One JSON object per line, older versions wrote the plain summary text blocks to LEGACY_SUMMARY_FILE
+SUMMARY_FILE = "agent_work_summaries.jsonl"
+LEGACY_SUMMARY_FILE = "agent_work_summaries.txt"
+lock = asyncio.Lock()  # Orders the stores and file writes, held across awaits without blocking the event loop
+# Anthropic client for summaries, awaited so the event loop keeps serving. It is shared by all requests, and its
+# pooled connections stay open for a minute, as worklogs arrive further apart than httpx's default 5s keep-alive.
+claude_client = anthropic.AsyncAnthropic(http_client=anthropic.DefaultAsyncHttpxClient(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+))
+# LLM summaries keyed by a hash of the assistant actions they summarize, so a resubmitted worklog costs no new call
+SUMMARY_CACHE_SIZE = 256
+summary_cache: "OrderedDict[bytes, str]" = OrderedDict()
 
 
 class WorklogRequest(BaseModel):
@@ -47,8 +63,25 @@ summaries: List[WorklogSummary] = []
 # read summary file at startup
 def read_previous_summaries():
     print("Reading contents of summary file: ", SUMMARY_FILE)
+    # The file is written by this service only, so the stored fields skip pydantic validation
+    construct = WorklogSummary.model_construct
     try:
-        with (open(SUMMARY_FILE, "r", encoding="utf-8") as f):
+        with open(SUMMARY_FILE, "rb") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        read_legacy_summaries()
+        return
+    for line in lines:
+        try:
+            summaries.append(construct(**orjson.loads(line)))
+        except (orjson.JSONDecodeError, TypeError):
+            continue  # blank or truncated line
+
+
+def read_legacy_summaries():
+    """Reads the text blocks of older versions, their timestamp is the end of the summarized timespan"""
+    try:
+        with (open(LEGACY_SUMMARY_FILE, "r", encoding="utf-8") as f):
             summary_text = ""
             current_agents = []
             current_timestamp = None
@@ -102,8 +135,12 @@ def read_previous_summaries():
 
 def extract_assistant_actions(messages: List[Dict[str, Any]]) -> str:
     """Extracts all assistant actions from the messages"""
-    assistant_msgs = []
+    return "\n\n".join(iter_assistant_actions(messages))
 
+
+def iter_assistant_actions(messages: List[Dict[str, Any]]) -> Iterator[str]:
+    """Yields the text of every action, so the join needs no intermediate list"""
+    renderer_for = BLOCK_RENDERERS.get  # bound once instead of looked up per block
     for msg in messages:
         content = msg.get("content", [])
 
@@ -111,28 +148,34 @@ def extract_assistant_actions(messages: List[Dict[str, Any]]) -> str:
         if isinstance(content, list):
             for block in content:
                 # todo does it make sense to check for "tool_result" here? I.e. do we need to check at all?
-                if block.get("type") == "text":
-                    assistant_msgs.append(block.get("text", ""))
-                elif block.get("type") == "tool_use":
-                    tool_name = block.get("name", "unknown tool")
-                    tool_input = block.get("input", {})
-                    assistant_msgs.append(f"Tool used: {tool_name} with input: {tool_input}")
+                render = renderer_for(block.get("type"))
+                if render is not None:
+                    yield render(block)
         elif isinstance(content, str):
-            assistant_msgs.append(content)
+            yield content
 
-    return "\n\n".join(assistant_msgs)
 
+def render_text_block(block: Dict[str, Any]) -> str:
+    return block.get("text", "")
 
-def summarize_worklog(agent_name: str, messages: List[Dict[str, Any]],
-                      first_timestamp: str, last_timestamp: str) -> str:
-    """Creates a summary of assistant actions in the messages"""
-    assistant_actions = extract_assistant_actions(messages)
 
-    if not assistant_actions:
-        return f"=== AGENT: {agent_name} ===\nTIMESPAN: {first_timestamp} to {last_timestamp}\nTOTAL STEPS: 0\n\nNo assistant activity found."
+def render_tool_use_block(block: Dict[str, Any]) -> str:
+    return f"Tool used: {block.get('name', 'unknown tool')} with input: {block.get('input', {})}"
 
-    try:
-        summarise_message = f"""Here are the actions of an AI assistant in a conversation:
+
+# Block types that are actions of the assistant, all others are skipped
+BLOCK_RENDERERS = {"text": render_text_block, "tool_use": render_tool_use_block}
+
+
+async def request_summary(assistant_actions: str) -> str:
+    """Returns the LLM summary of the assistant actions, answered from summary_cache for actions seen before"""
+    key = hashlib.blake2b(assistant_actions.encode(), digest_size=16).digest()
+    cached = summary_cache.get(key)
+    if cached is not None:
+        summary_cache.move_to_end(key)
+        return cached
+
+    summarise_message = f"""Here are the actions of an AI assistant in a conversation:
 
                     {assistant_actions}
                     
@@ -142,21 +185,37 @@ def summarize_worklog(agent_name: str, messages: List[Dict[str, Any]],
                     3. Uses bullet points for better readability
                     4. Is brief but informative"""
 
-        system_prompt = f"""You are a helpful assistant. Your task is to summarize the actions of an AI assistant in a conversation. 
+    system_prompt = f"""You are a helpful assistant. Your task is to summarize the actions of an AI assistant in a conversation. 
         Make sure to focus on the assistant's activities, tools used, and results achieved. Use bullet points for clarity and conciseness. 
         Don't glance over important details, especially anything that seems out of the ordinary."""
 
-        # LLM request for summary
-        response = claude_client.messages.create(
-            model="claude-3-5-haiku-latest",
-            max_tokens=500,
-            messages=[
-                MessageParam(role="user", content=system_prompt),
-                MessageParam(role="user", content=summarise_message)
-            ]
-        )
+    # LLM request for summary
+    response = await claude_client.messages.create(
+        model="claude-3-5-haiku-latest",
+        max_tokens=500,
+        messages=[
+            MessageParam(role="user", content=system_prompt),
+            MessageParam(role="user", content=summarise_message)
+        ]
+    )
 
-        agent_summary = response.content[0].text  # type: ignore
+    agent_summary = response.content[0].text  # type: ignore
+    summary_cache[key] = agent_summary
+    if len(summary_cache) > SUMMARY_CACHE_SIZE:
+        summary_cache.popitem(last=False)
+    return agent_summary
+
+
+async def summarize_worklog(agent_name: str, messages: List[Dict[str, Any]],
+                      first_timestamp: str, last_timestamp: str) -> str:
+    """Creates a summary of assistant actions in the messages"""
+    assistant_actions = extract_assistant_actions(messages)
+
+    if not assistant_actions:
+        return f"=== AGENT: {agent_name} ===\nTIMESPAN: {first_timestamp} to {last_timestamp}\nTOTAL STEPS: 0\n\nNo assistant activity found."
+
+    try:
+        agent_summary = await request_summary(assistant_actions)
 
         # Count assistant messages
         step_count = sum(1 for msg in messages if msg.get("role") == "assistant")
@@ -189,12 +248,13 @@ async def submit_worklog(request: WorklogRequest):
     if not messages:
         raise HTTPException(status_code=400, detail="Empty messages provided")
 
-    now = datetime.now(timezone.utc).isoformat()
+    # The LLM call takes seconds, so it runs before taking the lock and concurrent submissions don't queue up behind it
+    summary_text = await summarize_worklog(agent_name, messages, first_timestamp, last_timestamp)
     response = {"status": "ok"}
 
-    with lock:
-        # Create summary
-        summary_text = summarize_worklog(agent_name, messages, first_timestamp, last_timestamp)
+    async with lock:
+        # Stamped under the lock, so summaries stay ordered by timestamp and after_timestamp never skips one
+        now = datetime.now(timezone.utc).isoformat()
 
         # Store summary
         summary = WorklogSummary(
@@ -205,9 +265,8 @@ async def submit_worklog(request: WorklogRequest):
 
         summaries.append(summary)
 
-        # Save summary to file
-        with open(SUMMARY_FILE, "a", encoding="utf-8") as f:
-            f.write(f"{summary_text}\n\n")
+        # Save summary to file, in a worker thread so other requests are served meanwhile
+        await asyncio.to_thread(append_to_file, SUMMARY_FILE, serialize_summary(summary))
 
         response["summary_created"] = True
         response["summary_timestamp"] = now
@@ -215,17 +274,31 @@ async def submit_worklog(request: WorklogRequest):
     return response
 
 
+def append_to_file(path: str, data: bytes) -> None:
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def serialize_summary(summary: WorklogSummary) -> bytes:
+    """Returns the summary as one line of JSON, keeping its real timestamp"""
+    return orjson.dumps({"timestamp": summary.timestamp, "summary": summary.summary, "agents": summary.agents}) + b"\n"
+
+
 @app.get("/summaries")
 async def get_summaries(after_timestamp: Optional[str] = None):
     """Retrieves summaries after a specified timestamp"""
     if after_timestamp:
         try:
-            # Validate timestamp format
-            datetime.strptime(after_timestamp, "%Y-%m-%dT%H:%M:%S.%f")
-            filtered_summaries = [s for s in summaries if s.timestamp > after_timestamp]
-            return filtered_summaries
+            # Validate timestamp format, this also accepts the +00:00 offset of the stored timestamps
+            datetime.fromisoformat(after_timestamp)
         except ValueError:
             # Return HTTP 400 for invalid timestamp format
             raise HTTPException(status_code=400, detail="Invalid timestamp format. Expected ISO 8601 format.")
+        # Summaries are kept in timestamp order, so the newer ones are a tail found by binary search
+        return summaries[bisect.bisect_right(summaries, after_timestamp, key=summary_timestamp):]
     return summaries
 
+
+def summary_timestamp(summary: WorklogSummary) -> str:
+    return summary.timestamp
+
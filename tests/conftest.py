@@ -4,6 +4,7 @@ Shared fixtures and path setup for the agenty-python test suite.
 import json
 import os
 import sys
+import tempfile
 
 import pytest
 
@@ -15,7 +16,7 @@ _HERE = os.path.dirname(os.path.abspath(__file__))
 _REPO_ROOT = os.path.dirname(_HERE)
 
 for _dir in [
-    _REPO_ROOT,                                       # for `from agent.tools_utils import ...`
+    _REPO_ROOT,                                       # repository root
     os.path.join(_REPO_ROOT, "agent"),                # for `from tools import ...`, `from util import ...`
     os.path.join(_REPO_ROOT, "group_chat"),
     os.path.join(_REPO_ROOT, "oversight_officer"),
@@ -24,6 +25,19 @@ for _dir in [
     if _dir not in sys.path:
         sys.path.insert(0, _dir)
 
+# --- Import group_chat from a scratch directory ---
+# Importing it loads the chat files of the working directory and migrates a legacy chat_messages.txt,
+# which must not happen to the files in the repository root. The root goes first on sys.path meanwhile,
+# as pytest puts it when importing the test modules, so group_chat resolves to the package.
+_cwd = os.getcwd()
+os.chdir(tempfile.mkdtemp(prefix="group_chat_"))
+sys.path.insert(0, _REPO_ROOT)
+try:
+    import group_chat.group_chat  # noqa: E402,F401
+finally:
+    sys.path.remove(_REPO_ROOT)
+    os.chdir(_cwd)
+
 
 # ---------------------------------------------------------------------------
 # Shared test data
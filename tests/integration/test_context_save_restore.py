@@ -1,5 +1,6 @@
 """Integration tests: context save and restore cycle."""
-import pickle
+import gzip
+import json
 
 import pytest
 
@@ -13,7 +14,7 @@ class TestContextSaveRestore:
             {"role": "user", "content": "Hello"},
             {"role": "assistant", "content": "Hi there!"},
         ]
-        save_file = str(tmp_working_dir / "context.pkl")
+        save_file = str(tmp_working_dir / "context.json")
         save_conversation(conv, save_file)
         loaded = load_conversation(save_file)
         assert loaded == conv
@@ -24,7 +25,7 @@ class TestContextSaveRestore:
             {"role": "assistant", "content": [{"type": "text", "text": "Working..."}]},
             {"role": "user", "content": "Continue"},
         ]
-        save_file = str(tmp_working_dir / "conv.pkl")
+        save_file = str(tmp_working_dir / "conv.json")
         save_conversation(original, save_file)
         restored = load_conversation(save_file)
         assert restored == original
@@ -32,7 +33,7 @@ class TestContextSaveRestore:
 
     def test_save_returns_true_on_success(self, tmp_working_dir):
         conv = [{"role": "user", "content": "test"}]
-        result = save_conversation(conv, str(tmp_working_dir / "out.pkl"))
+        result = save_conversation(conv, str(tmp_working_dir / "out.json"))
         assert result is True
 
     def test_save_returns_false_on_failure(self, tmp_working_dir):
@@ -43,18 +44,31 @@ class TestContextSaveRestore:
         assert result is False
 
     def test_cleanup_removes_context_file(self, tmp_working_dir):
-        ctx_file = tmp_working_dir / "conversation_context.pkl"
+        ctx_file = tmp_working_dir / "conversation_context.json.gz"
         save_conversation([{"role": "user", "content": "test"}], str(ctx_file))
         assert ctx_file.exists()
         cleanup_context()
         assert not ctx_file.exists()
 
     def test_load_returns_none_for_missing_file(self, tmp_working_dir):
-        result = load_conversation(str(tmp_working_dir / "missing.pkl"))
+        result = load_conversation(str(tmp_working_dir / "missing.json"))
         assert result is None
 
     def test_save_load_empty_conversation(self, tmp_working_dir):
-        save_file = str(tmp_working_dir / "empty.pkl")
+        save_file = str(tmp_working_dir / "empty.json")
         save_conversation([], save_file)
         loaded = load_conversation(save_file)
         assert loaded == []
+
+    def test_saved_file_is_gzipped_json(self, tmp_working_dir):
+        conv = [{"role": "user", "content": "héllo"}]
+        save_file = tmp_working_dir / "conv.json.gz"
+        save_conversation(conv, str(save_file))
+        assert json.loads(gzip.decompress(save_file.read_bytes())) == conv
+        assert not (tmp_working_dir / "conv.json.gz.tmp").exists()
+
+    def test_failed_save_leaves_no_temp_file(self, tmp_working_dir):
+        subdir = tmp_working_dir / "subdir"
+        subdir.mkdir()
+        save_conversation([], str(subdir))
+        assert not (tmp_working_dir / "subdir.tmp").exists()
@@ -11,11 +11,19 @@ client = TestClient(app)
 @pytest.fixture(autouse=True)
 def reset_state(tmp_path, monkeypatch):
     gc.messages.clear()
+    gc.messages_json = None
+    gc.active_users.clear()
     gc.message_count = 0
-    monkeypatch.setattr(gc, "MSG_FILE", str(tmp_path / "chat_messages.txt"))
+    gc.total_stored = 0
+    monkeypatch.setattr(gc, "MSG_FILE", str(tmp_path / "chat_messages.jsonl"))
+    monkeypatch.setattr(gc, "LEGACY_MSG_FILE", str(tmp_path / "chat_messages.txt"))
     yield
+    gc.flush_messages()
     gc.messages.clear()
+    gc.messages_json = None
+    gc.active_users.clear()
     gc.message_count = 0
+    gc.total_stored = 0
 
 
 class TestGroupChatApiIntegration:
@@ -0,0 +1,35 @@
+"""Unit tests for agent/base_agent.py"""
+from types import SimpleNamespace
+
+import pytest
+
+from base_agent import echo_block
+
+
+# ---------------------------------------------------------------------------
+# echo_block
+# ---------------------------------------------------------------------------
+
+class TestEchoBlock:
+    def test_text_block(self):
+        block = SimpleNamespace(type="text", text="Hello")
+        assert echo_block(block) == {"type": "text", "text": "Hello", "cache_control": {"type": "ephemeral"}}
+
+    def test_tool_use_block(self):
+        block = SimpleNamespace(type="tool_use", id="toolu_1", name="read_file", input={"path": "a.txt"})
+        assert echo_block(block) == {
+            "type": "tool_use",
+            "id": "toolu_1",
+            "name": "read_file",
+            "input": {"path": "a.txt"},
+            "cache_control": {"type": "ephemeral"},
+        }
+
+    def test_text_block_ignores_other_attributes(self):
+        block = SimpleNamespace(type="text", text="Hi", citations=None)
+        assert set(echo_block(block)) == {"type", "text", "cache_control"}
+
+    def test_unknown_block_type_raises(self):
+        block = SimpleNamespace(type="thinking", thinking="...")
+        with pytest.raises(ValueError, match="thinking"):
+            echo_block(block)
@@ -1,4 +1,6 @@
 """Unit tests for agent/context_handling.py"""
+import gzip
+import json
 import pickle
 import sys
 import threading
@@ -98,10 +100,10 @@ class TestLoadConversation:
 
     def test_returns_deserialized_conversation(self, tmp_path):
         expected = [{"role": "user", "content": "Hello"}]
-        pkl_file = tmp_path / "conv.pkl"
-        pkl_file.write_bytes(pickle.dumps(expected))
+        json_file = tmp_path / "conv.json"
+        json_file.write_text(json.dumps(expected))
 
-        result = load_conversation(str(pkl_file))
+        result = load_conversation(str(json_file))
         assert result == expected
 
     def test_load_complex_conversation(self, tmp_path):
@@ -110,12 +112,36 @@ class TestLoadConversation:
             {"role": "assistant", "content": "Hello!"},
             {"role": "user", "content": "How are you?"},
         ]
-        pkl_file = tmp_path / "conv.pkl"
-        pkl_file.write_bytes(pickle.dumps(expected))
+        json_file = tmp_path / "conv.json"
+        json_file.write_text(json.dumps(expected))
 
-        result = load_conversation(str(pkl_file))
+        result = load_conversation(str(json_file))
         assert result == expected
 
+    def test_reads_gzipped_json(self, tmp_path):
+        expected = [{"role": "user", "content": "Hello"}]
+        gz_file = tmp_path / "conv.json.gz"
+        gz_file.write_bytes(gzip.compress(json.dumps(expected).encode()))
+
+        assert load_conversation(str(gz_file)) == expected
+
+    def test_falls_back_to_legacy_pickle(self, tmp_working_dir):
+        expected = [{"role": "user", "content": "Hello"}]
+        (tmp_working_dir / "conversation_context.pkl").write_bytes(pickle.dumps(expected))
+
+        assert load_conversation() == expected
+
+    def test_json_context_wins_over_legacy_pickle(self, tmp_working_dir):
+        (tmp_working_dir / "conversation_context.pkl").write_bytes(pickle.dumps([{"role": "user", "content": "old"}]))
+        (tmp_working_dir / "conversation_context.json.gz").write_text('[{"role": "user", "content": "new"}]')
+
+        assert load_conversation() == [{"role": "user", "content": "new"}]
+
+    def test_explicit_file_does_not_fall_back_to_legacy_pickle(self, tmp_working_dir):
+        (tmp_working_dir / "conversation_context.pkl").write_bytes(pickle.dumps([]))
+
+        assert load_conversation(str(tmp_working_dir / "other.json")) is None
+
 
 # ---------------------------------------------------------------------------
 # cleanup_context
@@ -123,19 +149,27 @@ class TestLoadConversation:
 
 class TestCleanupContext:
     def test_deletes_context_file(self, tmp_working_dir):
-        ctx_file = tmp_working_dir / "conversation_context.pkl"
+        ctx_file = tmp_working_dir / "conversation_context.json.gz"
         ctx_file.write_bytes(b"data")
 
         cleanup_context()
 
         assert not ctx_file.exists()
 
+    def test_deletes_legacy_pickle(self, tmp_working_dir):
+        legacy_file = tmp_working_dir / "conversation_context.pkl"
+        legacy_file.write_bytes(b"data")
+
+        cleanup_context()
+
+        assert not legacy_file.exists()
+
     def test_noop_when_file_missing(self, tmp_working_dir):
         # Should not raise when file doesn't exist
         cleanup_context()
 
     def test_skipped_when_is_restarting_true(self, tmp_working_dir):
-        ctx_file = tmp_working_dir / "conversation_context.pkl"
+        ctx_file = tmp_working_dir / "conversation_context.json.gz"
         ctx_file.write_bytes(b"data")
 
         sys.is_restarting = True
@@ -144,7 +178,7 @@ class TestCleanupContext:
         assert ctx_file.exists()  # file should NOT have been deleted
 
     def test_skipped_when_is_error_exit_true(self, tmp_working_dir):
-        ctx_file = tmp_working_dir / "conversation_context.pkl"
+        ctx_file = tmp_working_dir / "conversation_context.json.gz"
         ctx_file.write_bytes(b"data")
 
         sys.is_error_exit = True
@@ -0,0 +1,15 @@
+"""Unit tests for agent/http_utils.py"""
+import requests
+
+import http_utils
+from http_utils import session
+
+
+class TestSession:
+    def test_is_shared_requests_session(self):
+        assert isinstance(session, requests.Session)
+        assert http_utils.session is session
+
+    def test_http_adapter_is_pooled(self):
+        adapter = session.get_adapter("http://127.0.0.1:5000/messages")
+        assert adapter._pool_maxsize == 32
@@ -0,0 +1,29 @@
+"""Unit tests for agent/json_utils.py"""
+import json
+
+from json_utils import dumps, dumps_indented, loads
+
+
+class TestDumps:
+    def test_returns_str(self):
+        assert isinstance(dumps({"a": 1}), str)
+
+    def test_round_trips_through_stdlib(self):
+        data = {"success": True, "stdout": "héllo", "lines": ["a", "b"], "returncode": 0}
+        assert json.loads(dumps(data)) == data
+
+    def test_output_is_compact(self):
+        assert dumps({"a": [1, 2]}) == '{"a":[1,2]}'
+
+
+class TestLoads:
+    def test_parses_str(self):
+        assert loads('{"a": [1, 2]}') == {"a": [1, 2]}
+
+    def test_parses_bytes(self):
+        assert loads(b'{"path": "h\xc3\xa9"}') == {"path": "hé"}
+
+
+class TestDumpsIndented:
+    def test_returns_utf8_bytes_indented_by_two(self):
+        assert dumps_indented({"a": "é"}) == '{\n  "a": "é"\n}'.encode()
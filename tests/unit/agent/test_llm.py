@@ -123,7 +123,7 @@ class TestRemoveCacheControls:
 
 class TestRunInference:
     @patch("time.sleep")
-    @patch("agent.tools_utils.get_tools_param")
+    @patch("tools_utils.get_tools_param")
     def test_success_returns_content_and_tokens(self, mock_get_tools, mock_sleep):
         mock_get_tools.return_value = []
         mock_response = _make_mock_response(input_tokens=100, output_tokens=50)
@@ -140,7 +140,7 @@ class TestRunInference:
         assert tokens == 150  # 100 + 50
 
     @patch("time.sleep")
-    @patch("agent.tools_utils.get_tools_param")
+    @patch("tools_utils.get_tools_param")
     def test_429_retries_five_times_then_raises(self, mock_get_tools, mock_sleep):
         mock_get_tools.return_value = []
         mock_client = MagicMock()
@@ -157,7 +157,7 @@ class TestRunInference:
         assert mock_sleep.call_count == 5
 
     @patch("time.sleep")
-    @patch("agent.tools_utils.get_tools_param")
+    @patch("tools_utils.get_tools_param")
     def test_529_retries_five_times_then_raises(self, mock_get_tools, mock_sleep):
         mock_get_tools.return_value = []
         mock_client = MagicMock()
@@ -173,7 +173,7 @@ class TestRunInference:
         assert mock_client.messages.create.call_count == 5
 
     @patch("time.sleep")
-    @patch("agent.tools_utils.get_tools_param")
+    @patch("tools_utils.get_tools_param")
     def test_success_after_transient_failure(self, mock_get_tools, mock_sleep):
         mock_get_tools.return_value = []
         mock_response = _make_mock_response()
@@ -194,7 +194,7 @@ class TestRunInference:
         assert mock_client.messages.create.call_count == 3
 
     @patch("time.sleep")
-    @patch("agent.tools_utils.get_tools_param")
+    @patch("tools_utils.get_tools_param")
     def test_non_retryable_error_raises_immediately(self, mock_get_tools, mock_sleep):
         mock_get_tools.return_value = []
         mock_client = MagicMock()
@@ -209,3 +209,20 @@ class TestRunInference:
 
         # Should not retry for non-retryable errors
         assert mock_client.messages.create.call_count == 1
+
+    @patch("time.sleep")
+    @patch("tools_utils.get_tools_param")
+    def test_passed_tools_param_is_sent_without_rebuilding(self, mock_get_tools, mock_sleep):
+        tools_param = [{"name": "read_file"}]
+        mock_client = MagicMock()
+        mock_client.messages.create.return_value = _make_mock_response()
+
+        run_inference(
+            conversation=[{"role": "user", "content": "Hello"}],
+            llm_client=mock_client,
+            tools=[],
+            tools_param=tools_param,
+        )
+
+        mock_get_tools.assert_not_called()
+        assert mock_client.messages.create.call_args.kwargs["tools"] is tools_param
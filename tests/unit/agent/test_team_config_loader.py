@@ -171,3 +171,20 @@ class TestDockerMode:
         )
         carmen = next(a for a in config.agents if a.name == "Carmen")
         assert carmen.host == "agent-2"
+
+
+# ---------------------------------------------------------------------------
+# reload_team_config
+# ---------------------------------------------------------------------------
+
+class TestReloadTeamConfig:
+    def test_reuses_initialize_arguments(self, team_config_file, monkeypatch):
+        monkeypatch.chdir(team_config_file.parent)
+        team_config_loader.initialize_team_config(docker_mode=True, docker_agent_index=1)
+        first = team_config_loader.TEAM_CONFIG
+
+        reloaded = team_config_loader.reload_team_config()
+
+        assert reloaded is team_config_loader.TEAM_CONFIG
+        assert reloaded is not first
+        assert reloaded.get_current_agent().name == first.get_current_agent().name
@@ -6,7 +6,7 @@ from unittest.mock import MagicMock
 import pytest
 
 import tools_utils
-from tools_utils import deal_with_tool_results, execute_tool, get_tool_list
+from tools_utils import deal_with_tool_results, execute_tool, get_tool_list, get_tools_by_name, get_tools_param
 from tools.base_tool import ToolDefinition
 
 
@@ -67,6 +67,28 @@ class TestGetToolList:
             assert base_tools.issubset(names)
 
 
+# ---------------------------------------------------------------------------
+# get_tools_param
+# ---------------------------------------------------------------------------
+
+class TestGetToolsParam:
+    def test_reuses_prebuilt_tool_params(self):
+        tools = get_tool_list(is_team_mode=False)
+        params = get_tools_param(is_team_mode=False)
+        for tool, param in zip(tools, params):
+            assert param is tool.tool_param
+            assert param == {"name": tool.name, "description": tool.description, "input_schema": tool.input_schema}
+
+    def test_appends_web_search_tool(self):
+        params = get_tools_param(is_team_mode=True)
+        assert params[-1]["name"] == "web_search"
+
+    def test_last_tool_is_cache_breakpoint(self):
+        params = get_tools_param(is_team_mode=False)
+        assert params[-1]["cache_control"] == {"type": "ephemeral"}
+        assert all("cache_control" not in param for param in params[:-1])
+
+
 # ---------------------------------------------------------------------------
 # execute_tool
 # ---------------------------------------------------------------------------
@@ -108,6 +130,22 @@ class TestExecuteTool:
         assert "something went wrong" in result
         assert isinstance(result, str)
 
+    def test_accepts_tools_keyed_by_name(self):
+        tools = get_tools_by_name(_make_tools([("a", lambda d: "A"), ("b", lambda d: "B")]))
+        assert execute_tool(tools, "b", {}) == "B"
+        assert execute_tool(tools, "c", {}) == "tool not found"
+
+    def test_logs_tool_input(self, capsys):
+        execute_tool(_make_tools([("t", lambda d: "ok")]), "t", {"path": "a.txt"})
+        assert '{"path":"a.txt"}' in capsys.readouterr().out
+
+    def test_logs_only_name_when_input_logging_disabled(self, mocker, capsys):
+        mocker.patch("tools_utils.LOG_TOOL_INPUT", False)
+        mock_dumps = mocker.patch("tools_utils.dumps")
+        execute_tool(_make_tools([("t", lambda d: "ok")]), "t", {"path": "a.txt"})
+        assert "a.txt" not in capsys.readouterr().out
+        mock_dumps.assert_not_called()
+
     def test_does_not_raise_on_tool_exception(self):
         def raiser(data):
             raise RuntimeError("crash")
@@ -118,6 +156,12 @@ class TestExecuteTool:
         assert isinstance(result, str)
 
 
+class TestGetToolsByName:
+    def test_maps_each_name_to_its_definition(self):
+        tools = _make_tools([("a", lambda d: "A"), ("b", lambda d: "B")])
+        assert get_tools_by_name(tools) == {"a": tools[0], "b": tools[1]}
+
+
 # ---------------------------------------------------------------------------
 # deal_with_tool_results
 # ---------------------------------------------------------------------------
@@ -184,3 +228,28 @@ class TestDealWithToolResults:
 
         mock_restart.assert_not_called()
         mock_execv.assert_not_called()
+
+    def test_does_not_parse_results_without_restart(self, mocker):
+        mock_loads = mocker.patch("tools_utils.loads")
+
+        deal_with_tool_results([{"type": "tool_result", "content": '{"success": true}'}], [])
+
+        mock_loads.assert_not_called()
+
+    def test_no_restart_on_json_list_mentioning_restart(self, mocker):
+        mock_restart = mocker.patch("tools_utils.save_conv_and_restart")
+
+        deal_with_tool_results([{"type": "tool_result", "content": '["restart"]'}], [])
+
+        mock_restart.assert_not_called()
+
+    def test_restarts_only_once_for_several_signals(self, mocker):
+        mock_restart = mocker.patch("tools_utils.save_conv_and_restart")
+
+        tool_results = [
+            {"type": "tool_result", "content": '{"restart": true}'},
+            {"type": "tool_result", "content": {"restart": True}},
+        ]
+        deal_with_tool_results(tool_results, [])
+
+        mock_restart.assert_called_once()
@@ -1,7 +1,8 @@
 """Unit tests for agent/util.py"""
 import pytest
 
-from util import get_agent_turn_delay_in_ms, get_new_messages_from_group_chat, log_error
+import util
+from util import check_for_agent_restart, get_agent_turn_delay_in_ms, get_new_messages_from_group_chat, log_error
 
 
 # ---------------------------------------------------------------------------
@@ -31,6 +32,11 @@ class TestGetAgentTurnDelay:
 # ---------------------------------------------------------------------------
 
 class TestLogError:
+    @pytest.fixture(autouse=True)
+    def close_log(self):
+        yield
+        util.close_error_log()
+
     def test_writes_message_to_error_file(self, tmp_working_dir):
         log_error("something broke")
         error_file = tmp_working_dir / "error.txt"
@@ -65,12 +71,34 @@ class TestLogError:
         # Should not raise
         log_error("test")
 
+    def test_keeps_file_open_between_errors(self, tmp_working_dir):
+        log_error("first error")
+        handle = util.error_log
+        log_error("second error")
+        assert util.error_log is handle
+        assert "second error" in (tmp_working_dir / "error.txt").read_text()
+
+    def test_reopens_after_working_directory_changed(self, tmp_path, monkeypatch):
+        first, second = tmp_path / "a", tmp_path / "b"
+        first.mkdir()
+        second.mkdir()
+        monkeypatch.chdir(first)
+        log_error("first error")
+        monkeypatch.chdir(second)
+        log_error("second error")
+        assert "second error" not in (first / "error.txt").read_text()
+        assert "second error" in (second / "error.txt").read_text()
+
 
 # ---------------------------------------------------------------------------
 # get_new_messages_from_group_chat
 # ---------------------------------------------------------------------------
 
 class TestGetNewMessagesFromGroupChat:
+    @pytest.fixture(autouse=True)
+    def reset_cursor(self, monkeypatch):
+        monkeypatch.setattr(util, "LAST_MESSAGE_TIMESTAMP", None)
+
     def test_returns_new_messages_on_200(self, mocker):
         mock_response = mocker.MagicMock()
         mock_response.status_code = 200
@@ -78,7 +106,7 @@ class TestGetNewMessagesFromGroupChat:
             {"username": "Alice", "message": "hi"},
             {"username": "Bob", "message": "hello"},
         ]
-        mocker.patch("util.requests.get", return_value=mock_response)
+        mocker.patch("util.session.get", return_value=mock_response)
 
         result = get_new_messages_from_group_chat([])
         assert len(result) == 2
@@ -91,7 +119,7 @@ class TestGetNewMessagesFromGroupChat:
             {"username": "Alice", "message": "hi"},
             {"username": "Bob", "message": "hello"},
         ]
-        mocker.patch("util.requests.get", return_value=mock_response)
+        mocker.patch("util.session.get", return_value=mock_response)
 
         result = get_new_messages_from_group_chat(existing)
         assert len(result) == 1
@@ -99,14 +127,14 @@ class TestGetNewMessagesFromGroupChat:
 
     def test_returns_empty_list_on_connection_error(self, mocker):
         import requests
-        mocker.patch("util.requests.get", side_effect=requests.ConnectionError())
+        mocker.patch("util.session.get", side_effect=requests.ConnectionError())
         result = get_new_messages_from_group_chat([])
         assert result == []
 
     def test_returns_empty_list_on_non_200_status(self, mocker):
         mock_response = mocker.MagicMock()
         mock_response.status_code = 500
-        mocker.patch("util.requests.get", return_value=mock_response)
+        mocker.patch("util.session.get", return_value=mock_response)
         result = get_new_messages_from_group_chat([])
         assert result == []
 
@@ -115,7 +143,60 @@ class TestGetNewMessagesFromGroupChat:
         mock_response = mocker.MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = msgs
-        mocker.patch("util.requests.get", return_value=mock_response)
+        mocker.patch("util.session.get", return_value=mock_response)
 
         result = get_new_messages_from_group_chat(msgs)
         assert result == []
+
+    def test_first_poll_fetches_everything(self, mocker):
+        mock_response = mocker.MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = []
+        get = mocker.patch("util.session.get", return_value=mock_response)
+
+        get_new_messages_from_group_chat([])
+        assert get.call_args.kwargs["params"] == {"after_timestamp": None}
+
+    def test_next_poll_asks_only_for_newer_messages(self, mocker):
+        mock_response = mocker.MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [
+            {"username": "Alice", "timestamp": "2025-01-01T10:00:00+00:00", "message": "hi"},
+            {"username": "Bob", "timestamp": "2025-01-01T10:00:05+00:00", "message": "hello"},
+        ]
+        get = mocker.patch("util.session.get", return_value=mock_response)
+
+        get_new_messages_from_group_chat([])
+        get_new_messages_from_group_chat([])
+        assert get.call_args.kwargs["params"] == {"after_timestamp": "2025-01-01T10:00:05+00:00"}
+
+
+# ---------------------------------------------------------------------------
+# check_for_agent_restart
+# ---------------------------------------------------------------------------
+
+def tool_result_message(content):
+    return {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t1", "content": content}]}
+
+
+class TestCheckForAgentRestart:
+    def test_detects_agent_initiated_restart(self):
+        conversation = [
+            tool_result_message('{"restart":true,"agent_initiated":true}'),
+            {"role": "assistant", "content": "ok"},
+        ]
+        assert check_for_agent_restart(conversation) is True
+
+    def test_ignores_restart_not_initiated_by_agent(self):
+        conversation = [tool_result_message('{"restart":true}')]
+        assert check_for_agent_restart(conversation) is False
+
+    def test_does_not_parse_results_without_restart(self, mocker):
+        loads = mocker.patch("util.loads")
+        conversation = [tool_result_message('{"success":true}'), tool_result_message("plain text")]
+        assert check_for_agent_restart(conversation) is False
+        loads.assert_not_called()
+
+    def test_skips_invalid_json_mentioning_restart(self):
+        conversation = [tool_result_message('"restart" but not json')]
+        assert check_for_agent_restart(conversation) is False
@@ -0,0 +1,14 @@
+"""Unit tests for agent/tools/base_tool.py"""
+from tools.base_tool import parse_input
+
+
+class TestParseInput:
+    def test_dict_is_returned_unchanged(self):
+        data = {"path": "a.txt"}
+        assert parse_input(data) is data
+
+    def test_parses_json_string(self):
+        assert parse_input('{"path": "a.txt"}') == {"path": "a.txt"}
+
+    def test_parses_json_bytes(self):
+        assert parse_input(b'{"path": "a.txt"}') == {"path": "a.txt"}
@@ -1,10 +1,16 @@
 """Unit tests for agent/tools/command_tool.py"""
+import importlib
 import json
+import os
+import time
+from collections import deque
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 import tools.command_tool as ct
+from tools.base_tool import split_args
 from tools.command_tool import BLOCKED_COMMANDS, command_line_tool
 
 
@@ -14,6 +20,9 @@ def clear_active_processes():
     ct.active_processes.clear()
     ct.process_counter = 0
     yield
+    for process_info in ct.active_processes.values():
+        if process_info["process"].poll() is None:
+            process_info["process"].kill()
     ct.active_processes.clear()
     ct.process_counter = 0
 
@@ -69,3 +78,198 @@ class TestCommandLineTool:
         result = json.loads(command_line_tool({"command": "echo test"}))
         # Result should be valid JSON
         assert isinstance(result, dict)
+
+
+class TestReapFinishedProcesses:
+    def _register(self, process_id, poll_result, finish_time=None):
+        mock_proc = MagicMock()
+        mock_proc.poll.return_value = poll_result
+        info = {"process": mock_proc, "command": "cmd", "start_time": 0, "output_buffer": [], "error_buffer": []}
+        if finish_time is not None:
+            info["finish_time"] = finish_time
+        ct.active_processes[process_id] = info
+        return mock_proc
+
+    def test_keeps_running_process(self):
+        self._register(1, poll_result=None)
+        ct.reap_finished_processes()
+        assert 1 in ct.active_processes
+
+    def test_keeps_recently_finished_process(self):
+        self._register(1, poll_result=0)
+        ct.reap_finished_processes()
+        assert 1 in ct.active_processes
+        assert "finish_time" in ct.active_processes[1]
+
+    def test_drops_process_finished_longer_than_ttl_ago(self):
+        mock_proc = self._register(1, poll_result=0, finish_time=0)
+        ct.reap_finished_processes()
+        assert 1 not in ct.active_processes
+        mock_proc.__exit__.assert_called_once_with(None, None, None)
+
+    def test_closes_pipes_of_dropped_process(self, monkeypatch):
+        result = json.loads(command_line_tool({"command": "sleep 5", "keep_alive": True}))
+        process = ct.active_processes[result["process_id"]]["process"]
+        process.kill()
+        process.wait()
+        ct.reap_finished_processes()  # records the finish time
+        monkeypatch.setattr(ct, "FINISHED_PROCESS_TTL", -1)
+        ct.reap_finished_processes()
+        assert result["process_id"] not in ct.active_processes
+        assert process.stdout.closed and process.stderr.closed and process.stdin.closed
+
+
+class TestOutputBuffers:
+    def test_persistent_process_buffers_are_bounded(self):
+        result = json.loads(command_line_tool({"command": "sleep 5", "keep_alive": True}))
+        process_id = result["process_id"]
+        try:
+            buffer = ct.active_processes[process_id]["output_buffer"]
+            for i in range(ct.OUTPUT_BUFFER_LINES + 10):
+                buffer.append(f"line {i}")
+            assert len(buffer) == ct.OUTPUT_BUFFER_LINES
+            assert buffer[0] == "line 10"
+        finally:
+            ct.active_processes[process_id]["process"].kill()
+
+    def test_output_action_returns_lists(self):
+        result = json.loads(command_line_tool({"command": "sleep 5", "keep_alive": True}))
+        process_id = result["process_id"]
+        try:
+            ct.active_processes[process_id]["output_buffer"].append("hello")
+            output = json.loads(command_line_tool({"process_action": "output", "process_id": process_id}))
+            assert output["stdout"] == ["hello"]
+            assert output["stderr"] == []
+        finally:
+            ct.active_processes[process_id]["process"].kill()
+
+    def test_drain_pipe_keeps_multibyte_characters_split_across_reads(self):
+        read_fd, write_fd = os.pipe()
+        try:
+            key = SimpleNamespace(fd=read_fd, fileobj=None, data={"buffer": deque(), "partial": b""})
+            encoded = "größe\n".encode()
+            os.write(write_fd, encoded[:3])  # ends in the middle of "ö"
+            ct.drain_pipe(key)
+            os.write(write_fd, encoded[3:])
+            ct.drain_pipe(key)
+            assert list(key.data["buffer"]) == ["größe"]
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test_pump_captures_stdout_and_stderr_lines(self):
+        result = json.loads(command_line_tool({
+            "command": "sh",
+            "args": "-c 'echo one; echo two; echo oops >&2; exec sleep 5'",
+            "keep_alive": True,
+        }))
+        process_info = ct.active_processes[result["process_id"]]
+        try:
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and (len(process_info["output_buffer"]) < 2
+                                                   or not process_info["error_buffer"]):
+                time.sleep(0.05)
+            assert list(process_info["output_buffer"]) == ["one", "two"]
+            assert list(process_info["error_buffer"]) == ["oops"]
+        finally:
+            process_info["process"].kill()
+
+    def test_persistent_start_does_not_sleep(self):
+        with patch("tools.command_tool.time.sleep") as mock_sleep:
+            result = json.loads(command_line_tool({"command": "sleep 5", "keep_alive": True}))
+        assert result["success"] is True
+        mock_sleep.assert_not_called()
+
+    def test_pump_sleeps_on_wakeup_event_when_idle(self):
+        ct.start_pump()
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and (ct.pump_wakeup.is_set() or ct.pump_selector.get_map()):
+            time.sleep(0.01)
+        # The pump consumed the wakeup and is parked on the event again
+        assert not ct.pump_wakeup.is_set()
+        assert ct.pump_thread.is_alive()
+
+
+class TestSplitArgs:
+    def test_splits_quoted_arguments(self):
+        assert split_args("echo 'hello world' x") == ("echo", "hello world", "x")
+
+    def test_repeated_command_hits_cache(self):
+        split_args.cache_clear()
+        command_line_tool({"command": "echo cached"})
+        command_line_tool({"command": "echo cached"})
+        assert split_args.cache_info().hits >= 1
+
+
+class TestGetBaseCommand:
+    def test_plain_command(self):
+        assert ct.get_base_command("ls -la /tmp") == "ls"
+
+    def test_quoted_program_name_is_unquoted(self):
+        assert ct.get_base_command("'rm' -rf /tmp/x") == "rm"
+
+    def test_rejects_quoted_blocked_command(self):
+        result = json.loads(command_line_tool({"command": "\"rm\" -rf /tmp/test"}))
+        assert result["success"] is False
+
+    def test_empty_command(self):
+        assert ct.get_base_command("   ") == ""
+
+
+class TestResolveExecutable:
+    def test_resolves_program_from_path(self):
+        ct.EXECUTABLE_PATHS.clear()
+        path = ct.resolve_executable("echo")
+        assert path is not None and path.endswith("/echo")
+        assert ct.EXECUTABLE_PATHS["echo"] == path
+
+    def test_keeps_explicit_paths(self):
+        assert ct.resolve_executable("./script.sh") == "./script.sh"
+
+    def test_does_not_cache_missing_programs(self):
+        assert ct.resolve_executable("no_such_program_xyz_123") is None
+        assert "no_such_program_xyz_123" not in ct.EXECUTABLE_PATHS
+
+    def test_missing_program_returns_error_json(self):
+        result = json.loads(command_line_tool({"command": "no_such_program_xyz_123"}))
+        assert result["success"] is False
+
+
+class TestSendInputToProcess:
+    def test_input_reaches_process(self):
+        result = json.loads(command_line_tool({"command": "cat", "keep_alive": True}))
+        process_id = result["process_id"]
+        process_info = ct.active_processes[process_id]
+        try:
+            sent = json.loads(command_line_tool({"process_id": process_id, "input_text": "ping"}))
+            assert sent["success"] is True
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and not process_info["output_buffer"]:
+                time.sleep(0.05)
+            assert list(process_info["output_buffer"]) == ["ping"]
+        finally:
+            process_info["process"].kill()
+
+    def test_times_out_when_stdin_is_full(self, monkeypatch):
+        result = json.loads(command_line_tool({"command": "sleep 5", "keep_alive": True}))
+        process_id = result["process_id"]
+        monkeypatch.setattr(ct, "INPUT_TIMEOUT", 0.2)
+        try:
+            # sleep never reads its stdin, so the pipe fills up and the write must time out
+            sent = json.loads(command_line_tool({"process_id": process_id, "input_text": "x" * 1_000_000}))
+            assert sent["success"] is False
+            assert "Timeout" in sent["error"]
+            # A process that stopped reading its stdin is terminated
+            assert ct.active_processes[process_id]["process"].wait(timeout=5) is not None
+        finally:
+            ct.active_processes[process_id]["process"].kill()
+
+
+class TestModuleReload:
+    def test_reload_keeps_registry_and_pump(self):
+        ct.start_pump()
+        registry, selector, thread = ct.active_processes, ct.pump_selector, ct.pump_thread
+        importlib.reload(ct)
+        assert ct.active_processes is registry
+        assert ct.pump_selector is selector
+        assert ct.pump_thread is thread
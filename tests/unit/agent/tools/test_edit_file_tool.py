@@ -1,6 +1,9 @@
 """Unit tests for agent/tools/edit_file_tool.py"""
+import os
+
 import pytest
 
+import tools.edit_file_tool as edit_file_tool
 from tools.edit_file_tool import edit_file
 
 
@@ -48,3 +51,91 @@ class TestEditFileTool:
     def test_raises_file_not_found_when_file_missing_and_old_str_nonempty(self, tmp_working_dir):
         with pytest.raises(FileNotFoundError):
             edit_file({"path": "missing.txt", "old_str": "something", "new_str": "other"})
+
+    def test_raises_when_old_str_occurs_more_than_once(self, tmp_working_dir):
+        f = tmp_working_dir / "file.txt"
+        f.write_text("dup and dup")
+        with pytest.raises(ValueError, match="more than once"):
+            edit_file({"path": "file.txt", "old_str": "dup", "new_str": "single"})
+        assert f.read_text() == "dup and dup"
+
+    def test_replaces_non_ascii_content(self, tmp_working_dir):
+        f = tmp_working_dir / "file.txt"
+        f.write_text("größe – alt", encoding="utf-8")
+        edit_file({"path": "file.txt", "old_str": "alt", "new_str": "neu"})
+        assert f.read_text(encoding="utf-8") == "größe – neu"
+
+    def test_leaves_no_temp_file_behind(self, tmp_working_dir):
+        (tmp_working_dir / "file.txt").write_text("before")
+        edit_file({"path": "file.txt", "old_str": "before", "new_str": "after"})
+        assert [p.name for p in tmp_working_dir.iterdir()] == ["file.txt"]
+
+    def test_raises_when_file_is_empty(self, tmp_working_dir):
+        (tmp_working_dir / "empty.txt").write_text("")
+        with pytest.raises(ValueError, match="not found"):
+            edit_file({"path": "empty.txt", "old_str": "x", "new_str": "y"})
+
+    def test_replaces_in_large_file_via_mmap(self, tmp_working_dir, monkeypatch):
+        monkeypatch.setattr(edit_file_tool, "MMAP_THRESHOLD", 8)
+        f = tmp_working_dir / "big.txt"
+        f.write_text("head\nneedle\ntail\n")
+        edit_file({"path": "big.txt", "old_str": "needle", "new_str": "thread"})
+        assert f.read_text() == "head\nthread\ntail\n"
+
+    def test_honours_explicit_encoding(self, tmp_working_dir):
+        f = tmp_working_dir / "latin.txt"
+        f.write_bytes("café au lait".encode("latin-1"))
+        edit_file({"path": "latin.txt", "old_str": "café", "new_str": "thé", "encoding": "latin-1"})
+        assert f.read_bytes().decode("latin-1") == "thé au lait"
+
+    def test_replaces_multiline_old_str_in_crlf_file(self, tmp_working_dir):
+        f = tmp_working_dir / "crlf.txt"
+        f.write_bytes(b"a\r\nb\r\nc\r\n")
+        edit_file({"path": "crlf.txt", "old_str": "a\nb", "new_str": "x\ny"})
+        assert f.read_bytes() == b"x\r\ny\r\nc\r\n"
+
+    def test_replaces_multiline_old_str_in_large_crlf_file(self, tmp_working_dir, monkeypatch):
+        monkeypatch.setattr(edit_file_tool, "MMAP_THRESHOLD", 4)
+        f = tmp_working_dir / "crlf.txt"
+        f.write_bytes(b"a\r\nb\r\nc\r\n")
+        edit_file({"path": "crlf.txt", "old_str": "b\nc", "new_str": "d"})
+        assert f.read_bytes() == b"a\r\nd\r\n"
+
+    def test_mixed_line_endings_match_the_raw_old_str_first(self, tmp_working_dir):
+        f = tmp_working_dir / "mixed.txt"
+        f.write_bytes(b"a\r\nb\nc\n")
+        edit_file({"path": "mixed.txt", "old_str": "b\nc", "new_str": "x\ny"})
+        assert f.read_bytes() == b"a\r\nx\ny\n"
+
+    @pytest.mark.parametrize("threshold", [1 << 20, 2])
+    def test_overlapping_occurrences_are_duplicates_on_both_paths(self, tmp_working_dir, monkeypatch, threshold):
+        monkeypatch.setattr(edit_file_tool, "MMAP_THRESHOLD", threshold)
+        (tmp_working_dir / "file.txt").write_text("xaaax")
+        with pytest.raises(ValueError, match="more than once"):
+            edit_file({"path": "file.txt", "old_str": "aa", "new_str": "b"})
+
+    def test_edits_symlink_target_and_keeps_the_link(self, tmp_working_dir):
+        target = tmp_working_dir / "target.txt"
+        target.write_text("old text")
+        link = tmp_working_dir / "link.txt"
+        link.symlink_to(target)
+        edit_file({"path": "link.txt", "old_str": "old", "new_str": "new"})
+        assert link.is_symlink()
+        assert target.read_text() == "new text"
+
+    def test_edits_all_hard_links(self, tmp_working_dir):
+        original = tmp_working_dir / "original.txt"
+        original.write_text("old text")
+        other = tmp_working_dir / "other.txt"
+        os.link(original, other)
+        edit_file({"path": "original.txt", "old_str": "old", "new_str": "new"})
+        assert other.read_text() == "new text"
+        assert original.stat().st_ino == other.stat().st_ino
+
+    def test_edits_hard_linked_large_file_in_place(self, tmp_working_dir, monkeypatch):
+        monkeypatch.setattr(edit_file_tool, "MMAP_THRESHOLD", 4)
+        original = tmp_working_dir / "original.txt"
+        original.write_text("head needle tail")
+        os.link(original, tmp_working_dir / "other.txt")
+        edit_file({"path": "original.txt", "old_str": "needle", "new_str": "pin"})
+        assert (tmp_working_dir / "other.txt").read_text() == "head pin tail"
@@ -0,0 +1,121 @@
+"""Unit tests for agent/tools/git_command_tool.py"""
+import importlib
+import json
+import subprocess
+
+import pytest
+
+import tools.git_command_tool as gt
+from tools.git_command_tool import git_command
+
+
+@pytest.fixture(autouse=True)
+def reset_work_repo_path():
+    """Each test runs in its own temp directory, forget the cached work_repo path."""
+    gt.WORK_REPO_PATH = None
+    yield
+    gt.WORK_REPO_PATH = None
+
+
+@pytest.fixture
+def work_repo(tmp_working_dir):
+    """A git repository in ./work_repo with a single commit."""
+    repo = tmp_working_dir / "work_repo"
+    repo.mkdir()
+    (repo / "hello.txt").write_text("hello\n")
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], cwd=repo, check=True)
+    subprocess.run(git + ["add", "hello.txt"], cwd=repo, check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], cwd=repo, check=True)
+    yield repo
+    gt.close_all_batches()
+
+
+class TestCatFileBatch:
+    def test_type_is_served_by_batch_process(self, work_repo):
+        result = json.loads(git_command({"command": "cat-file", "args": "-t HEAD"}))
+        assert result["success"] is True
+        assert result["stdout"] == "commit"
+        assert str(work_repo) in gt.git_batches
+
+    def test_blob_content_matches_git(self, work_repo):
+        result = json.loads(git_command({"command": "cat-file", "args": "-p HEAD:hello.txt"}))
+        assert result["stdout"] == "hello"
+
+    def test_size_and_existence(self, work_repo):
+        assert json.loads(git_command({"command": "cat-file", "args": "-s HEAD:hello.txt"}))["stdout"] == "6"
+        assert json.loads(git_command({"command": "cat-file", "args": "-e HEAD"}))["success"] is True
+
+    def test_missing_object_falls_back_to_git(self, work_repo):
+        result = json.loads(git_command({"command": "cat-file", "args": "-t HEAD:missing.txt"}))
+        assert result["success"] is False
+        assert result["stderr"]
+
+    def test_tree_pretty_print_falls_back_to_git(self, work_repo):
+        result = json.loads(git_command({"command": "cat-file", "args": "-p HEAD^{tree}"}))
+        assert "hello.txt" in result["stdout"]
+        assert "blob" in result["stdout"]
+
+    def test_other_commands_do_not_start_batch(self, work_repo):
+        result = json.loads(git_command({"command": "status", "args": "--porcelain"}))
+        assert result["success"] is True
+        assert gt.git_batches == {}
+
+    def test_reload_keeps_running_batches(self, work_repo):
+        git_command({"command": "cat-file", "args": "-t HEAD"})
+        batches = gt.git_batches
+        importlib.reload(gt)
+        assert gt.git_batches is batches
+        assert str(work_repo) in gt.git_batches
+
+    def test_show_file_at_revision(self, work_repo):
+        result = json.loads(git_command({"command": "show", "args": "HEAD:hello.txt"}))
+        assert result["stdout"] == "hello"
+        assert str(work_repo) in gt.git_batches
+
+    def test_show_commit_falls_back_to_git(self, work_repo):
+        result = json.loads(git_command({"command": "show", "args": "HEAD"}))
+        assert "init" in result["stdout"]
+        assert str(work_repo) not in gt.git_batches
+
+    def test_rev_parse_matches_git(self, work_repo):
+        expected = subprocess.run(["git", "rev-parse", "HEAD"], cwd=work_repo,
+                                  capture_output=True, text=True).stdout.strip()
+        result = json.loads(git_command({"command": "rev-parse", "args": "HEAD"}))
+        assert result["stdout"] == expected
+
+    def test_rev_parse_options_fall_back_to_git(self, work_repo):
+        result = json.loads(git_command({"command": "rev-parse", "args": "--show-toplevel"}))
+        assert result["stdout"] == str(work_repo)
+        assert gt.git_batches == {}
+
+    @pytest.mark.parametrize("git_cmd", [["git", "show", 1], ["git", "rev-parse", None], ["git", "cat-file", "-t", 1]])
+    def test_non_string_object_is_left_to_git(self, work_repo, git_cmd):
+        assert gt.query_git_batch(git_cmd, str(work_repo)) is None
+        assert gt.git_batches == {}
+
+
+class TestGitCommandArgs:
+    def test_accepts_pre_split_args_list(self, work_repo):
+        result = json.loads(git_command({"command": "log", "args": ["--format=%s", "-n", "1"]}))
+        assert result["stdout"] == "init"
+
+    def test_list_args_are_not_shell_parsed(self, work_repo, mocker):
+        split = mocker.patch("tools.git_command_tool.split_args")
+        git_command({"command": "status", "args": ["--porcelain"]})
+        split.assert_not_called()
+
+
+class TestWorkRepoPath:
+    def test_missing_work_repo_returns_error(self, tmp_working_dir):
+        result = json.loads(git_command({"command": "status"}))
+        assert result["success"] is False
+        assert "does not exist" in result["error"]
+        assert gt.WORK_REPO_PATH is None
+
+    def test_path_is_cached_once_it_exists(self, work_repo, mocker):
+        git_command({"command": "status"})
+        getcwd = mocker.patch("tools.git_command_tool.os.getcwd")
+        git_command({"command": "status"})
+        assert gt.WORK_REPO_PATH == str(work_repo)
+        getcwd.assert_not_called()
@@ -0,0 +1,42 @@
+"""Unit tests for agent/tools/graceful_shutdown_tool.py"""
+import pytest
+
+from tools.graceful_shutdown_tool import graceful_shutdown
+
+
+class ExitCalled(Exception):
+    pass
+
+
+@pytest.fixture
+def exit_and_write(mocker):
+    """Stop at os._exit and capture what is written to fd 1."""
+    mock_exit = mocker.patch("tools.graceful_shutdown_tool.os._exit", side_effect=ExitCalled)
+    mock_write = mocker.patch("tools.graceful_shutdown_tool.os.write")
+    return mock_exit, mock_write
+
+
+class TestGracefulShutdownTool:
+    def test_writes_banner_once_and_exits_zero(self, tmp_working_dir, exit_and_write):
+        mock_exit, mock_write = exit_and_write
+        with pytest.raises(ExitCalled):
+            graceful_shutdown({"reason": "done", "final_message": "bye"})
+        mock_write.assert_called_once()
+        fd, data = mock_write.call_args.args
+        assert fd == 1
+        assert b"Reason: done" in data
+        assert b"Final message: bye" in data
+        mock_exit.assert_called_once_with(0)
+
+    def test_deletes_context_file(self, tmp_working_dir, exit_and_write):
+        context = tmp_working_dir / "conversation_context.json.gz"
+        context.write_bytes(b"data")
+        with pytest.raises(ExitCalled):
+            graceful_shutdown({})
+        assert not context.exists()
+        assert b"Successfully deleted context file" in exit_and_write[1].call_args.args[1]
+
+    def test_missing_context_file_is_reported(self, tmp_working_dir, exit_and_write):
+        with pytest.raises(ExitCalled):
+            graceful_shutdown({})
+        assert b"Context file not found" in exit_and_write[1].call_args.args[1]
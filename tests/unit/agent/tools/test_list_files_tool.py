@@ -1,9 +1,12 @@
 """Unit tests for agent/tools/list_files_tool.py"""
 import json
+import os
+import types
 
 import pytest
 
-from tools.list_files_tool import list_files
+import tools.list_files_tool as list_files_tool
+from tools.list_files_tool import iter_entries, list_files
 
 
 class TestListFilesTool:
@@ -56,3 +59,63 @@ class TestListFilesTool:
         assert isinstance(result, str)
         parsed = json.loads(result)
         assert isinstance(parsed, list)
+
+    def test_nested_entries_are_relative_to_path(self, tmp_working_dir):
+        nested = tmp_working_dir / "pkg" / "sub"
+        nested.mkdir(parents=True)
+        (nested / "mod.py").write_text("x")
+        result = json.loads(list_files({"path": "pkg"}))
+        assert sorted(result) == ["sub/", "sub/mod.py"]
+
+    def test_excluded_folder_is_not_descended(self, tmp_working_dir):
+        deep = tmp_working_dir / "web" / "node_modules" / "lib"
+        deep.mkdir(parents=True)
+        (deep / "index.js").write_text("x")
+        result = json.loads(list_files({"path": "."}))
+        assert sorted(result) == ["web/"]
+
+    def test_symlinked_directory_is_listed_but_not_followed(self, tmp_working_dir):
+        target = tmp_working_dir / "target"
+        target.mkdir()
+        (target / "inner.txt").write_text("x")
+        (tmp_working_dir / "link").symlink_to(target)
+        result = json.loads(list_files({"path": "."}))
+        assert "link/" in result
+        assert "link/inner.txt" not in result
+
+    def test_unreadable_subdirectory_is_listed_without_contents(self, tmp_working_dir, monkeypatch):
+        locked = tmp_working_dir / "locked"
+        locked.mkdir()
+        (locked / "secret.txt").write_text("x")
+        (tmp_working_dir / "open.txt").write_text("x")
+        locked.chmod(0)
+        # root can still read a chmod 000 directory, so the denial is simulated as well
+        real_scandir = os.scandir
+
+        def scandir(path):
+            if os.path.basename(path) == "locked":
+                raise PermissionError(13, "Permission denied", path)
+            return real_scandir(path)
+
+        monkeypatch.setattr(list_files_tool.os, "scandir", scandir)
+        try:
+            result = json.loads(list_files({"path": "."}))
+        finally:
+            locked.chmod(0o755)
+        assert sorted(result) == ["locked/", "open.txt"]
+
+    def test_unreadable_root_directory_raises(self, tmp_working_dir, monkeypatch):
+        def scandir(path):
+            raise PermissionError(13, "Permission denied", path)
+
+        monkeypatch.setattr(list_files_tool.os, "scandir", scandir)
+        with pytest.raises(PermissionError):
+            list_files({"path": "."})
+
+
+class TestIterEntries:
+    def test_is_lazy_generator(self, tmp_working_dir):
+        (tmp_working_dir / "a.txt").write_text("x")
+        entries = iter_entries(".")
+        assert isinstance(entries, types.GeneratorType)
+        assert list(entries) == ["a.txt"]
@@ -4,12 +4,20 @@ import json
 import pytest
 import requests
 
+import tools.report_suspicious_activity_tool as rsat
 from tools.report_suspicious_activity_tool import report_suspicious_activity
 
 
+@pytest.fixture(autouse=True)
+def close_audit_log():
+    """Don't carry the open audit log over into the next test's working directory."""
+    yield
+    rsat.close_audit_log()
+
+
 class TestReportSuspiciousActivityTool:
     def test_posts_to_oversight_endpoint(self, mocker, tmp_working_dir):
-        mock_post = mocker.patch("tools.report_suspicious_activity_tool.requests.post")
+        mock_post = mocker.patch("tools.report_suspicious_activity_tool.session.post")
         mock_post.return_value = mocker.MagicMock(status_code=200)
 
         report_suspicious_activity({
@@ -22,7 +30,7 @@ class TestReportSuspiciousActivityTool:
         assert "oversight" in call_url or "report" in call_url
 
     def test_logs_to_local_audit_file(self, mocker, tmp_working_dir):
-        mock_post = mocker.patch("tools.report_suspicious_activity_tool.requests.post")
+        mock_post = mocker.patch("tools.report_suspicious_activity_tool.session.post")
         mock_post.return_value = mocker.MagicMock(status_code=200)
 
         report_suspicious_activity({
@@ -36,7 +44,7 @@ class TestReportSuspiciousActivityTool:
         assert "Suspicious behavior" in content or "SUSP_" in content
 
     def test_returns_success_message_on_200(self, mocker, tmp_working_dir):
-        mock_post = mocker.patch("tools.report_suspicious_activity_tool.requests.post")
+        mock_post = mocker.patch("tools.report_suspicious_activity_tool.session.post")
         mock_post.return_value = mocker.MagicMock(status_code=200)
 
         result = report_suspicious_activity({
@@ -48,7 +56,7 @@ class TestReportSuspiciousActivityTool:
 
     def test_returns_partial_success_when_api_fails(self, mocker, tmp_working_dir):
         mocker.patch(
-            "tools.report_suspicious_activity_tool.requests.post",
+            "tools.report_suspicious_activity_tool.session.post",
             side_effect=requests.ConnectionError("offline"),
         )
 
@@ -69,7 +77,7 @@ class TestReportSuspiciousActivityTool:
             report_suspicious_activity({"activity_description": "Something happened"})
 
     def test_report_id_in_result(self, mocker, tmp_working_dir):
-        mock_post = mocker.patch("tools.report_suspicious_activity_tool.requests.post")
+        mock_post = mocker.patch("tools.report_suspicious_activity_tool.session.post")
         mock_post.return_value = mocker.MagicMock(status_code=200)
 
         result = report_suspicious_activity({
@@ -77,3 +85,36 @@ class TestReportSuspiciousActivityTool:
             "reporter_name": "Watcher",
         })
         assert "SUSP_" in result
+
+    def test_audit_log_is_opened_once(self, mocker, tmp_working_dir):
+        mock_post = mocker.patch("tools.report_suspicious_activity_tool.session.post")
+        mock_post.return_value = mocker.MagicMock(status_code=200)
+
+        report_suspicious_activity({"activity_description": "first", "reporter_name": "Watcher"})
+        handle = rsat.audit_log
+        report_suspicious_activity({"activity_description": "second", "reporter_name": "Watcher"})
+
+        assert rsat.audit_log is handle
+        lines = (tmp_working_dir / "logs" / "suspicious_activity_reports.log").read_text().splitlines()
+        assert [json.loads(line)["description_preview"] for line in lines] == ["first", "second"]
+
+    def test_report_and_audit_entry_share_one_timestamp(self, mocker, tmp_working_dir):
+        mock_post = mocker.patch("tools.report_suspicious_activity_tool.session.post")
+        mock_post.return_value = mocker.MagicMock(status_code=200)
+
+        report_suspicious_activity({"activity_description": "clock", "reporter_name": "Watcher"})
+
+        sent = json.loads(mock_post.call_args.kwargs["data"])
+        entry = json.loads((tmp_working_dir / "logs" / "suspicious_activity_reports.log").read_text())
+        assert entry["timestamp"] == sent["timestamp"]
+        assert sent["report_id"] == "SUSP_" + sent["timestamp"][:19].replace("-", "").replace("T", "_").replace(":", "")
+
+    def test_posts_pre_serialized_json_body(self, mocker, tmp_working_dir):
+        mock_post = mocker.patch("tools.report_suspicious_activity_tool.session.post")
+        mock_post.return_value = mocker.MagicMock(status_code=200)
+
+        report_suspicious_activity({"activity_description": "body", "reporter_name": "Watcher"})
+
+        kwargs = mock_post.call_args.kwargs
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+        assert json.loads(kwargs["data"])["activity_description"] == "body"
@@ -0,0 +1,22 @@
+"""Unit tests for agent/tools/reset_context_tool.py"""
+import json
+
+from tools.reset_context_tool import reset_context
+
+
+class TestResetContextTool:
+    def test_deletes_existing_context_file(self, tmp_working_dir):
+        context = tmp_working_dir / "conversation_context.json.gz"
+        context.write_bytes(b"data")
+        result = json.loads(reset_context({}))
+        assert not context.exists()
+        assert "Successfully deleted" in result["message"]
+
+    def test_reports_missing_context_file(self, tmp_working_dir):
+        result = json.loads(reset_context({}))
+        assert "not found" in result["message"]
+
+    def test_signals_restart_without_saving(self, tmp_working_dir):
+        result = json.loads(reset_context({}))
+        assert result["restart"] is True
+        assert result["reset_context"] is True
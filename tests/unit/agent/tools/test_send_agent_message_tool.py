@@ -1,4 +1,7 @@
 """Unit tests for agent/tools/send_agent_message_tool.py"""
+import json
+import os
+
 import pytest
 import requests
 
@@ -10,18 +13,25 @@ from tools.send_agent_message_tool import send_agent_message
 def reset_agent_endpoints():
     """Reset cached AGENT_ENDPOINTS before and after each test."""
     samt.AGENT_ENDPOINTS = None
+    samt.AGENT_ENDPOINTS_MTIME = None
     yield
     samt.AGENT_ENDPOINTS = None
+    samt.AGENT_ENDPOINTS_MTIME = None
 
 
 def _set_endpoints(endpoints: dict):
+    """Seeds the cache as if it was loaded from the team config file as it is now."""
     samt.AGENT_ENDPOINTS = endpoints
+    try:
+        samt.AGENT_ENDPOINTS_MTIME = os.stat(samt.TEAM_CONFIG_FILE).st_mtime_ns
+    except OSError:
+        samt.AGENT_ENDPOINTS_MTIME = None
 
 
 class TestSendAgentMessageTool:
     def test_posts_to_correct_agent_url(self, mocker):
         _set_endpoints({"Bob": "http://bob-host:8082"})
-        mock_post = mocker.patch("tools.send_agent_message_tool.requests.post")
+        mock_post = mocker.patch("tools.send_agent_message_tool.session.post")
         mock_post.return_value = mocker.MagicMock(status_code=200)
         mock_post.return_value.raise_for_status = lambda: None
 
@@ -34,7 +44,7 @@ class TestSendAgentMessageTool:
 
     def test_returns_success_on_200(self, mocker):
         _set_endpoints({"Bob": "http://bob-host:8082"})
-        mock_post = mocker.patch("tools.send_agent_message_tool.requests.post")
+        mock_post = mocker.patch("tools.send_agent_message_tool.session.post")
         mock_post.return_value = mocker.MagicMock(status_code=200)
         mock_post.return_value.raise_for_status = lambda: None
 
@@ -51,7 +61,7 @@ class TestSendAgentMessageTool:
     def test_returns_error_on_connection_error(self, mocker):
         _set_endpoints({"Bob": "http://bob-host:8082"})
         mocker.patch(
-            "tools.send_agent_message_tool.requests.post",
+            "tools.send_agent_message_tool.session.post",
             side_effect=requests.ConnectionError("timeout"),
         )
         result = send_agent_message({"target_agent": "Bob", "from_agent": "Alice", "message": "hi"})
@@ -60,7 +70,7 @@ class TestSendAgentMessageTool:
     def test_returns_error_on_timeout(self, mocker):
         _set_endpoints({"Bob": "http://bob-host:8082"})
         mocker.patch(
-            "tools.send_agent_message_tool.requests.post",
+            "tools.send_agent_message_tool.session.post",
             side_effect=requests.Timeout("timed out"),
         )
         result = send_agent_message({"target_agent": "Bob", "from_agent": "Alice", "message": "hi"})
@@ -69,9 +79,112 @@ class TestSendAgentMessageTool:
     def test_loads_endpoints_from_team_config_when_none(self, mocker):
         mock_endpoints = {"Bob": "http://bob:8082"}
         mocker.patch("tools.send_agent_message_tool.get_agent_endpoints", return_value=mock_endpoints)
-        mock_post = mocker.patch("tools.send_agent_message_tool.requests.post")
+        mock_post = mocker.patch("tools.send_agent_message_tool.session.post")
         mock_post.return_value = mocker.MagicMock(status_code=200)
         mock_post.return_value.raise_for_status = lambda: None
 
         send_agent_message({"target_agent": "Bob", "from_agent": "Alice", "message": "hi"})
         assert samt.AGENT_ENDPOINTS is not None
+
+    def test_sends_to_each_comma_separated_agent(self, mocker):
+        _set_endpoints({"Bob": "http://bob-host:8082", "Carol": "http://carol-host:8083"})
+        mock_post = mocker.patch("tools.send_agent_message_tool.session.post")
+        mock_post.return_value = mocker.MagicMock(status_code=200)
+        mock_post.return_value.raise_for_status = lambda: None
+
+        result = send_agent_message({"target_agent": "Bob, Carol", "from_agent": "Alice", "message": "hi"})
+
+        called_urls = sorted(call.args[0] for call in mock_post.call_args_list)
+        assert called_urls == ["http://bob-host:8082/send-message", "http://carol-host:8083/send-message"]
+        assert "Message sent to Bob" in result
+        assert "Message sent to Carol" in result
+
+    def test_all_targets_get_the_same_json_body(self, mocker):
+        _set_endpoints({"Bob": "http://bob-host:8082", "Carol": "http://carol-host:8083"})
+        mock_post = mocker.patch("tools.send_agent_message_tool.session.post")
+        mock_post.return_value = mocker.MagicMock(status_code=200)
+        mock_post.return_value.raise_for_status = lambda: None
+
+        send_agent_message({"target_agent": "Bob,Carol", "from_agent": "Alice", "message": "hi"})
+
+        bodies = [call.kwargs["data"] for call in mock_post.call_args_list]
+        assert bodies[0] is bodies[1]
+        assert json.loads(bodies[0]) == {"message": "hi", "from_agent": "Alice"}
+        assert all(call.kwargs["headers"]["Content-Type"] == "application/json" for call in mock_post.call_args_list)
+
+    def test_unknown_agent_in_list_sends_nothing(self, mocker):
+        _set_endpoints({"Bob": "http://bob-host:8082"})
+        mock_post = mocker.patch("tools.send_agent_message_tool.session.post")
+
+        result = send_agent_message({"target_agent": "Bob,Dave", "from_agent": "Alice", "message": "hi"})
+
+        assert "Dave" in result
+        mock_post.assert_not_called()
+
+
+class TestGetCachedAgentEndpoints:
+    def test_reuses_endpoints_while_config_unchanged(self, mocker, tmp_working_dir):
+        (tmp_working_dir / "team-config.json").write_text("{}")
+        mock_get = mocker.patch("tools.send_agent_message_tool.get_agent_endpoints",
+                                return_value={"Bob": "http://bob:8082"})
+        samt.get_cached_agent_endpoints()
+        samt.get_cached_agent_endpoints()
+        mock_get.assert_called_once()
+
+    def test_reloads_when_config_file_changes(self, mocker, tmp_working_dir):
+        config = tmp_working_dir / "team-config.json"
+        config.write_text("{}")
+        mocker.patch("tools.send_agent_message_tool.get_agent_endpoints",
+                     side_effect=[{"Bob": "http://bob:8082"}, {"Carol": "http://carol:8083"}])
+        mock_reload = mocker.patch("tools.send_agent_message_tool.reload_team_config")
+
+        assert samt.get_cached_agent_endpoints() == {"Bob": "http://bob:8082"}
+        stat = config.stat()
+        os.utime(config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert samt.get_cached_agent_endpoints() == {"Carol": "http://carol:8083"}
+        mock_reload.assert_called_once()
+
+    def test_reloads_when_config_file_appears_after_first_call(self, mocker, tmp_working_dir):
+        mocker.patch("tools.send_agent_message_tool.get_agent_endpoints",
+                     side_effect=[{}, {"Bob": "http://bob:8082"}])
+        mock_reload = mocker.patch("tools.send_agent_message_tool.reload_team_config")
+
+        assert samt.get_cached_agent_endpoints() == {}
+        (tmp_working_dir / "team-config.json").write_text("{}")
+
+        assert samt.get_cached_agent_endpoints() == {"Bob": "http://bob:8082"}
+        mock_reload.assert_called_once()
+
+    def test_keeps_endpoints_when_reload_fails(self, mocker, tmp_working_dir):
+        config = tmp_working_dir / "team-config.json"
+        config.write_text("{}")
+        mock_get = mocker.patch("tools.send_agent_message_tool.get_agent_endpoints",
+                                return_value={"Bob": "http://bob:8082"})
+        mocker.patch("tools.send_agent_message_tool.reload_team_config", side_effect=ValueError("bad config"))
+
+        samt.get_cached_agent_endpoints()
+        config.unlink()
+
+        assert samt.get_cached_agent_endpoints() == {"Bob": "http://bob:8082"}
+        mock_get.assert_called_once()
+
+
+class TestPrewarmAgentConnections:
+    def test_opens_a_connection_to_each_agent(self, mocker):
+        _set_endpoints({"Bob": "http://bob:8082", "Carol": "http://carol:8083"})
+        mock_head = mocker.patch("tools.send_agent_message_tool.session.head")
+
+        samt.prewarm_agent_connections().join(timeout=5)
+
+        called = sorted(call.args[0] for call in mock_head.call_args_list)
+        assert called == ["http://bob:8082", "http://carol:8083"]
+
+    def test_ignores_unreachable_agents(self, mocker):
+        _set_endpoints({"Bob": "http://bob:8082"})
+        mocker.patch("tools.send_agent_message_tool.session.head", side_effect=requests.ConnectionError("down"))
+
+        thread = samt.prewarm_agent_connections()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
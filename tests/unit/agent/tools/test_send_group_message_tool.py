@@ -1,4 +1,6 @@
 """Unit tests for agent/tools/send_group_message_tool.py"""
+import json
+
 import pytest
 import requests
 
@@ -7,7 +9,7 @@ from tools.send_group_message_tool import send_group_message
 
 class TestSendGroupMessageTool:
     def test_posts_to_group_chat_endpoint(self, mocker):
-        mock_post = mocker.patch("tools.send_group_message_tool.requests.post")
+        mock_post = mocker.patch("tools.send_group_message_tool.session.post")
         mock_post.return_value = mocker.MagicMock(status_code=200)
         mock_post.return_value.raise_for_status = lambda: None
 
@@ -18,18 +20,18 @@ class TestSendGroupMessageTool:
         assert "/send" in args[0]
 
     def test_posts_correct_payload(self, mocker):
-        mock_post = mocker.patch("tools.send_group_message_tool.requests.post")
+        mock_post = mocker.patch("tools.send_group_message_tool.session.post")
         mock_post.return_value = mocker.MagicMock(status_code=200)
         mock_post.return_value.raise_for_status = lambda: None
 
         send_group_message({"from_agent": "Alice", "message": "hi there"})
 
         _, kwargs = mock_post.call_args
-        assert kwargs["json"]["username"] == "Alice"
-        assert kwargs["json"]["message"] == "hi there"
+        assert json.loads(kwargs["data"]) == {"username": "Alice", "message": "hi there"}
+        assert kwargs["headers"]["Content-Type"] == "application/json"
 
     def test_returns_success_message_on_200(self, mocker):
-        mock_post = mocker.patch("tools.send_group_message_tool.requests.post")
+        mock_post = mocker.patch("tools.send_group_message_tool.session.post")
         mock_post.return_value = mocker.MagicMock(status_code=200)
         mock_post.return_value.raise_for_status = lambda: None
 
@@ -39,7 +41,7 @@ class TestSendGroupMessageTool:
 
     def test_returns_error_message_on_connection_failure(self, mocker):
         mocker.patch(
-            "tools.send_group_message_tool.requests.post",
+            "tools.send_group_message_tool.session.post",
             side_effect=requests.ConnectionError("refused"),
         )
         result = send_group_message({"from_agent": "Bob", "message": "test"})
@@ -48,7 +50,7 @@ class TestSendGroupMessageTool:
     def test_returns_error_on_http_error_status(self, mocker):
         mock_resp = mocker.MagicMock(status_code=500)
         mock_resp.raise_for_status.side_effect = requests.HTTPError("500")
-        mocker.patch("tools.send_group_message_tool.requests.post", return_value=mock_resp)
+        mocker.patch("tools.send_group_message_tool.session.post", return_value=mock_resp)
 
         result = send_group_message({"from_agent": "Bob", "message": "test"})
         assert "Failed" in result or "Error" in result
@@ -1,9 +1,12 @@
 """Unit tests for agent/tools/task_tracker_tool.py"""
 import json
+import os
+from datetime import datetime
 
 import pytest
 
-from tools.task_tracker_tool import task_tracker
+from tools import task_tracker_tool
+from tools.task_tracker_tool import find_task, format_timestamp, save_tasks, task_tracker
 
 
 class TestTaskTrackerTool:
@@ -23,6 +26,21 @@ class TestTaskTrackerTool:
         result = task_tracker({"action": "list_tasks"})
         assert "Test task" in result
 
+    def test_new_task_has_identical_created_and_updated(self, tmp_working_dir):
+        task_tracker({"action": "add_task", "description": "Task A"})
+        task = json.loads((tmp_working_dir / "team_tasks.json").read_text())["tasks"][0]
+        assert task["created"] == task["updated"]
+        assert isinstance(task["created"], int)
+
+    def test_get_details_of_task_from_older_file(self, tmp_working_dir):
+        (tmp_working_dir / "team_tasks.json").write_text(json.dumps({"next_id": 2, "tasks": [{
+            "id": 1, "description": "Old", "status": "pending", "assigned_to": "unassigned",
+            "created": "2025-01-01T10:00:00", "updated": "2025-01-02T10:00:00",
+        }]}))
+        result = task_tracker({"action": "get_details", "task_id": 1})
+        assert "Created: 2025-01-01T10:00:00" in result
+        assert "Last updated: 2025-01-02T10:00:00" in result
+
     def test_add_task_returns_task_id_in_message(self, tmp_working_dir):
         result = task_tracker({"action": "add_task", "description": "My task"})
         assert "#1" in result
@@ -40,6 +58,16 @@ class TestTaskTrackerTool:
         assert "Task 1" in result
         assert "Task 2" in result
 
+    def test_list_tasks_output_format(self, tmp_working_dir):
+        task_tracker({"action": "add_task", "description": "A", "assigned_to": "agent1"})
+        task_tracker({"action": "add_task", "description": "B"})
+        result = task_tracker({"action": "list_tasks"})
+        assert result == (
+            "Tasks (2 found):\n"
+            "#1: A [pending] (assigned to: agent1)\n"
+            "#2: B [pending] (assigned to: unassigned)"
+        )
+
     def test_list_tasks_empty_when_no_tasks(self, tmp_working_dir):
         result = task_tracker({"action": "list_tasks"})
         assert "No tasks" in result
@@ -71,3 +99,76 @@ class TestTaskTrackerTool:
     def test_update_nonexistent_task_raises(self, tmp_working_dir):
         with pytest.raises(ValueError):
             task_tracker({"action": "update_status", "task_id": 999, "status": "completed"})
+
+    def test_file_is_indented(self, tmp_working_dir):
+        task_tracker({"action": "add_task", "description": "Task A"})
+        content = (tmp_working_dir / "team_tasks.json").read_text()
+        assert '\n  "next_id": 2' in content
+
+    def test_corrupt_file_starts_fresh(self, tmp_working_dir):
+        (tmp_working_dir / "team_tasks.json").write_text("{not json")
+        task_tracker({"action": "add_task", "description": "Task A"})
+        data = json.loads((tmp_working_dir / "team_tasks.json").read_text())
+        assert data["next_id"] == 2
+
+
+class TestFindTask:
+    def test_finds_task_by_position(self):
+        data = {"tasks": [{"id": 1}, {"id": 2}, {"id": 3}]}
+        assert find_task(data, 2) is data["tasks"][1]
+
+    def test_falls_back_to_scan_when_ids_are_out_of_order(self):
+        data = {"tasks": [{"id": 3}, {"id": 1}]}
+        assert find_task(data, 1) is data["tasks"][1]
+        assert find_task(data, 3) is data["tasks"][0]
+
+    def test_returns_none_for_unknown_id(self):
+        data = {"tasks": [{"id": 1}]}
+        assert find_task(data, 5) is None
+        assert find_task(data, 0) is None
+
+
+class TestSaveTasks:
+    def test_unchanged_data_is_not_rewritten(self, tmp_working_dir, mocker):
+        data = {"next_id": 1, "tasks": []}
+        save_tasks(data)
+        replace = mocker.spy(task_tracker_tool.os, "replace")
+        save_tasks(data)
+        replace.assert_not_called()
+
+    def test_rewrites_after_file_changed_externally(self, tmp_working_dir):
+        data = {"next_id": 1, "tasks": []}
+        save_tasks(data)
+        tasks_file = tmp_working_dir / "team_tasks.json"
+        tasks_file.write_text("{}")
+        os.utime(tasks_file, ns=(0, 0))
+        save_tasks(data)
+        assert json.loads(tasks_file.read_text()) == data
+
+    def test_leaves_no_temp_file(self, tmp_working_dir):
+        save_tasks({"next_id": 1, "tasks": []})
+        assert [p.name for p in tmp_working_dir.iterdir()] == ["team_tasks.json"]
+
+    def test_each_save_writes_its_own_temp_file(self, tmp_working_dir, mocker):
+        replace = mocker.spy(task_tracker_tool.os, "replace")
+        save_tasks({"next_id": 1, "tasks": []})
+        save_tasks({"next_id": 2, "tasks": []})
+        first, second = (call.args[0] for call in replace.call_args_list)
+        assert first != second
+        assert os.path.dirname(first) == str(tmp_working_dir)
+
+    def test_failed_replace_removes_temp_file(self, tmp_working_dir, mocker):
+        mocker.patch.object(task_tracker_tool.os, "replace", side_effect=OSError("disk full"))
+        with pytest.raises(OSError):
+            save_tasks({"next_id": 1, "tasks": []})
+        assert list(tmp_working_dir.iterdir()) == []
+
+
+class TestFormatTimestamp:
+    def test_formats_nanoseconds_as_local_iso_time(self):
+        ns = 1_700_000_000_123_456_789
+        expected = datetime.fromtimestamp(1_700_000_000).isoformat(timespec="seconds")
+        assert format_timestamp(ns) == expected
+
+    def test_legacy_iso_string_is_shown_unchanged(self):
+        assert format_timestamp("2025-01-01T10:00:00.123456") == "2025-01-01T10:00:00.123456"
@@ -22,11 +22,15 @@ class TestWaitTool:
         assert "Waited" in result or "waited" in result.lower()
 
     def test_zero_seconds_is_valid(self, mocker):
-        mock_sleep = mocker.patch("tools.wait_tool.time.sleep")
+        mocker.patch("tools.wait_tool.time.sleep")
         result = wait({"seconds": 0})
-        mock_sleep.assert_called_once_with(0)
         assert isinstance(result, str)
 
+    def test_zero_seconds_does_not_sleep(self, mocker):
+        mock_sleep = mocker.patch("tools.wait_tool.time.sleep")
+        wait({"seconds": 0})
+        mock_sleep.assert_not_called()
+
     def test_rejects_negative_duration(self):
         with pytest.raises(ValueError):
             wait({"seconds": -1})
@@ -1,6 +1,10 @@
 """Unit tests for group_chat/group_chat.py"""
+import collections
 import concurrent.futures
+import json
+import queue
 import threading
+from datetime import datetime, timezone
 
 import pytest
 from fastapi.testclient import TestClient
@@ -15,11 +19,19 @@ client = TestClient(app)
 def reset_group_chat_state(tmp_path, monkeypatch):
     """Reset in-memory state and redirect file writes to tmp_path before each test."""
     gc.messages.clear()
+    gc.messages_json = None
+    gc.active_users.clear()
     gc.message_count = 0
-    monkeypatch.setattr(gc, "MSG_FILE", str(tmp_path / "chat_messages.txt"))
+    gc.total_stored = 0
+    monkeypatch.setattr(gc, "MSG_FILE", str(tmp_path / "chat_messages.jsonl"))
+    monkeypatch.setattr(gc, "LEGACY_MSG_FILE", str(tmp_path / "chat_messages.txt"))
     yield
+    gc.flush_messages()
     gc.messages.clear()
+    gc.messages_json = None
+    gc.active_users.clear()
     gc.message_count = 0
+    gc.total_stored = 0
 
 
 # ---------------------------------------------------------------------------
@@ -62,6 +74,16 @@ class TestStatus:
         r = client.get("/status")
         assert r.json()["total_messages"] >= 1
 
+    def test_active_users_counts_distinct_senders(self):
+        for username in ("Alice", "Bob", "Alice"):
+            client.post("/send", json={"username": username, "message": "hi"})
+        assert client.get("/status").json()["active_users"] == 2
+
+    def test_active_users_includes_loaded_senders(self, tmp_path):
+        (tmp_path / "chat_messages.txt").write_text("Alice||ts||hi\nBob||ts||yo\n", encoding="utf-8")
+        gc.load_messages()
+        assert client.get("/status").json()["active_users"] == 2
+
 
 # ---------------------------------------------------------------------------
 # POST /send
@@ -81,18 +103,29 @@ class TestSend:
 
     def test_message_persisted_to_file(self, tmp_path):
         client.post("/send", json={"username": "Charlie", "message": "Stored"})
-        msg_file = tmp_path / "chat_messages.txt"
+        gc.flush_messages()
+        msg_file = tmp_path / "chat_messages.jsonl"
         assert msg_file.exists()
         content = msg_file.read_text()
         assert "Charlie" in content
         assert "Stored" in content
 
-    def test_file_format_is_pipe_separated(self, tmp_path):
+    def test_file_format_is_one_json_object_per_line(self, tmp_path):
         client.post("/send", json={"username": "Dave", "message": "Test"})
-        lines = (tmp_path / "chat_messages.txt").read_text().splitlines()
-        parts = lines[0].split("||")
-        assert len(parts) == 3
-        assert parts[0] == "Dave"
+        gc.flush_messages()
+        lines = (tmp_path / "chat_messages.jsonl").read_text().splitlines()
+        stored = json.loads(lines[0])
+        assert stored["username"] == "Dave"
+        assert stored["message"] == "Test"
+        assert "timestamp" in stored
+        assert stored["index"] == 0
+
+    def test_message_with_newline_and_separator_survives_reload(self):
+        client.post("/send", json={"username": "Dave", "message": "line 1\nline 2 || more"})
+        gc.flush_messages()
+        gc.messages.clear()
+        gc.load_messages()
+        assert [m.message for m in gc.messages] == ["line 1\nline 2 || more"]
 
     def test_rejects_missing_username_with_422(self):
         r = client.post("/send", json={"message": "no username"})
@@ -129,6 +162,154 @@ class TestGetMessages:
         assert "message" in msg
         assert "timestamp" in msg
 
+    def test_after_timestamp_returns_only_newer_messages(self):
+        client.post("/send", json={"username": "A", "message": "msg1"})
+        first = client.get("/messages").json()[0]
+        client.post("/send", json={"username": "B", "message": "msg2"})
+        r = client.get("/messages", params={"after_timestamp": first["timestamp"]})
+        assert [m["message"] for m in r.json()] == ["msg2"]
+
+    def test_after_latest_timestamp_returns_empty_list(self):
+        client.post("/send", json={"username": "A", "message": "msg1"})
+        latest = client.get("/messages").json()[-1]
+        r = client.get("/messages", params={"after_timestamp": latest["timestamp"]})
+        assert r.json() == []
+
+    def test_after_index_returns_only_messages_past_that_index(self):
+        for text in ("msg1", "msg2", "msg3"):
+            client.post("/send", json={"username": "A", "message": text})
+        r = client.get("/messages", params={"after_index": 2})
+        assert [m["message"] for m in r.json()] == ["msg3"]
+
+    def test_after_index_past_the_end_returns_empty_list(self):
+        client.post("/send", json={"username": "A", "message": "msg1"})
+        r = client.get("/messages", params={"after_index": 5})
+        assert r.json() == []
+
+    def test_filtered_messages_are_json_with_all_fields(self):
+        client.post("/send", json={"username": "A", "message": "msg1"})
+        client.post("/send", json={"username": "B", "message": "größe ✓"})
+        r = client.get("/messages", params={"after_index": 1})
+        assert r.headers["content-type"] == "application/json"
+        assert r.json() == [{"username": "B", "timestamp": gc.messages[1].timestamp, "message": "größe ✓"}]
+
+    def test_full_history_is_serialized_once_until_next_send(self):
+        client.post("/send", json={"username": "A", "message": "msg1"})
+        client.get("/messages")
+        cached = gc.messages_json
+        assert client.get("/messages").json()[0]["message"] == "msg1"
+        assert gc.messages_json is cached
+
+    def test_send_invalidates_serialized_history(self):
+        client.post("/send", json={"username": "A", "message": "msg1"})
+        client.get("/messages")
+        client.post("/send", json={"username": "B", "message": "msg2"})
+        assert [m["message"] for m in client.get("/messages").json()] == ["msg1", "msg2"]
+
+
+# ---------------------------------------------------------------------------
+# load_messages
+# ---------------------------------------------------------------------------
+
+class TestLoadMessages:
+    def test_loads_jsonl_messages(self, tmp_path):
+        (tmp_path / "chat_messages.jsonl").write_text(
+            '{"username": "Alice", "timestamp": "2025-01-01T10:00:00+00:00", "message": "hi"}\n',
+            encoding="utf-8",
+        )
+        gc.load_messages()
+        assert [(m.username, m.timestamp, m.message) for m in gc.messages] == [
+            ("Alice", "2025-01-01T10:00:00+00:00", "hi"),
+        ]
+
+    def test_reads_stored_index_and_counts_on_from_lines_without_one(self, tmp_path):
+        (tmp_path / "chat_messages.jsonl").write_text(
+            '{"username": "A", "timestamp": "t0", "message": "old"}\n'
+            '{"username": "A", "timest\n'
+            '{"username": "A", "timestamp": "t1", "message": "old"}\n'
+            '{"username": "A", "timestamp": "t5", "message": "new", "index": 5}\n'
+            '{"username": "A", "timestamp": "t6", "message": "new"}\n',
+            encoding="utf-8",
+        )
+        assert [i for i, _ in gc.read_stored_messages()] == [0, 1, 5, 6]
+        assert [i for i, _ in gc.read_stored_messages(5)] == [0, 1]
+        gc.load_messages()
+        assert gc.total_stored == 7
+
+    def test_truncated_last_line_does_not_swallow_next_message(self, tmp_path):
+        (tmp_path / "chat_messages.jsonl").write_text(
+            '{"username": "Alice", "timestamp": "ts", "message": "hi"}\n{"username": "Bo', encoding="utf-8"
+        )
+        gc.load_messages()
+        client.post("/send", json={"username": "Carol", "message": "after crash"})
+        gc.flush_messages()
+        assert [(i, m.message) for i, m in gc.read_stored_messages()] == [(0, "hi"), (1, "after crash")]
+
+    def test_skips_truncated_jsonl_line(self, tmp_path):
+        (tmp_path / "chat_messages.jsonl").write_text(
+            '{"username": "Alice", "timestamp": "ts", "message": "hi"}\n{"username": "Bo',
+            encoding="utf-8",
+        )
+        gc.load_messages()
+        assert len(gc.messages) == 1
+
+    def test_loads_legacy_messages(self, tmp_path):
+        (tmp_path / "chat_messages.txt").write_text(
+            "Alice||2025-01-01T10:00:00+00:00||hi\n"
+            "Bob||2025-01-01T10:00:05+00:00||a || b\n",
+            encoding="utf-8",
+        )
+        gc.load_messages()
+        assert [(m.username, m.timestamp, m.message) for m in gc.messages] == [
+            ("Alice", "2025-01-01T10:00:00+00:00", "hi"),
+            ("Bob", "2025-01-01T10:00:05+00:00", "a || b"),
+        ]
+
+    def test_migrates_legacy_file_to_jsonl(self, tmp_path):
+        (tmp_path / "chat_messages.txt").write_text("Alice||2025-01-01T10:00:00+00:00||hi\n", encoding="utf-8")
+        gc.load_messages()
+        assert not (tmp_path / "chat_messages.txt").exists()
+        gc.messages.clear()
+        gc.load_messages()
+        assert [(m.username, m.message) for m in gc.messages] == [("Alice", "hi")]
+
+    def test_failed_migration_keeps_legacy_file(self, tmp_path, mocker):
+        (tmp_path / "chat_messages.txt").write_text("Alice||2025-01-01T10:00:00+00:00||hi\n", encoding="utf-8")
+        mocker.patch.object(gc.os, "replace", side_effect=OSError("disk full"))
+        with pytest.raises(OSError):
+            gc.migrate_legacy_messages()
+        assert (tmp_path / "chat_messages.txt").exists()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["chat_messages.txt"]
+
+    def test_skips_malformed_legacy_lines(self, tmp_path):
+        (tmp_path / "chat_messages.txt").write_text("garbage\nAlice||ts||hi\n", encoding="utf-8")
+        gc.load_messages()
+        assert len(gc.messages) == 1
+
+    def test_loaded_messages_are_served(self, tmp_path):
+        (tmp_path / "chat_messages.txt").write_text("Alice||2025-01-01T10:00:00+00:00||hi\n", encoding="utf-8")
+        gc.load_messages()
+        assert client.get("/messages").json() == [
+            {"username": "Alice", "timestamp": "2025-01-01T10:00:00+00:00", "message": "hi"}
+        ]
+
+    def test_missing_file_starts_with_supervisor_message(self, tmp_path):
+        gc.load_messages()
+        assert [m.username for m in gc.messages] == ["supervisor"]
+        assert (tmp_path / "chat_messages.jsonl").exists()
+
+    def test_empty_legacy_file_starts_with_supervisor_message(self, tmp_path):
+        (tmp_path / "chat_messages.txt").write_text("", encoding="utf-8")
+        gc.load_messages()
+        gc.messages.clear()
+        gc.load_messages()
+        assert [m.username for m in gc.messages] == ["supervisor"]
+
+    def test_empty_jsonl_file_starts_with_supervisor_message(self, tmp_path):
+        (tmp_path / "chat_messages.jsonl").write_text("", encoding="utf-8")
+        gc.load_messages()
+        assert [m.username for m in gc.messages] == ["supervisor"]
+
 
 # ---------------------------------------------------------------------------
 # Thread safety
@@ -147,3 +328,164 @@ class TestThreadSafety:
 
         assert all(r.status_code == 200 for r in results)
         assert len(gc.messages) == num_requests
+
+    def test_concurrent_sends_are_persisted_in_store_order(self, tmp_path):
+        def send(i):
+            return client.post("/send", json={"username": f"user{i}", "message": f"msg{i}"})
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as pool:
+            list(pool.map(send, range(20)))
+        gc.flush_messages()
+
+        lines = (tmp_path / "chat_messages.jsonl").read_text().splitlines()
+        assert [json.loads(line)["message"] for line in lines] == [m.message for m in gc.messages]
+
+
+# ---------------------------------------------------------------------------
+# utc_timestamp
+# ---------------------------------------------------------------------------
+
+class TestUtcTimestamp:
+    def test_matches_isoformat_with_microseconds(self, mocker):
+        mocker.patch.object(gc.time, "time_ns", return_value=1_700_000_000_123_456_789)
+        expected = datetime.fromtimestamp(1_700_000_000.123456, timezone.utc).isoformat()
+        assert gc.utc_timestamp() == expected
+
+    def test_keeps_microseconds_on_a_whole_second(self, mocker):
+        mocker.patch.object(gc.time, "time_ns", return_value=1_700_000_000_000_000_000)
+        assert gc.utc_timestamp() == "2023-11-14T22:13:20.000000+00:00"
+
+    def test_formats_date_once_per_second(self, mocker):
+        time_ns = mocker.patch.object(gc.time, "time_ns", return_value=1_700_000_000_000_000_000)
+        gc.utc_timestamp()
+        prefix = gc.second_prefix
+        time_ns.return_value += 999_999_000
+        assert gc.utc_timestamp().endswith(".999999+00:00")
+        assert gc.second_prefix is prefix
+        time_ns.return_value += 1_000
+        assert gc.utc_timestamp() == "2023-11-14T22:13:21.000000+00:00"
+
+    def test_send_stamps_messages_in_utc(self):
+        client.post("/send", json={"username": "A", "message": "hi"})
+        stamped = datetime.fromisoformat(gc.messages[0].timestamp)
+        assert abs((datetime.now(timezone.utc) - stamped).total_seconds()) < 5
+
+
+# ---------------------------------------------------------------------------
+# Memory cap
+# ---------------------------------------------------------------------------
+
+class TestMemoryCap:
+    @pytest.fixture(autouse=True)
+    def small_store(self, monkeypatch):
+        monkeypatch.setattr(gc, "messages", collections.deque(maxlen=2))
+
+    def send_all(self, *texts):
+        for text in texts:
+            client.post("/send", json={"username": "A", "message": text})
+        gc.flush_messages()
+
+    def test_keeps_only_latest_messages_in_memory(self):
+        self.send_all("msg1", "msg2", "msg3")
+        assert [m.message for m in gc.messages] == ["msg2", "msg3"]
+        assert [m["message"] for m in client.get("/messages").json()] == ["msg2", "msg3"]
+
+    def test_total_messages_counts_dropped_messages(self):
+        self.send_all("msg1", "msg2", "msg3")
+        assert client.get("/status").json()["total_messages"] == 3
+
+    def test_after_index_reads_dropped_messages_from_file(self):
+        self.send_all("msg1", "msg2", "msg3", "msg4")
+        r = client.get("/messages", params={"after_index": 1})
+        assert [m["message"] for m in r.json()] == ["msg2", "msg3", "msg4"]
+
+    def test_after_index_inside_memory_does_not_read_file(self, mocker):
+        self.send_all("msg1", "msg2", "msg3")
+        read = mocker.spy(gc, "read_stored_messages")
+        r = client.get("/messages", params={"after_index": 2})
+        assert [m["message"] for m in r.json()] == ["msg3"]
+        read.assert_not_called()
+
+    def test_after_timestamp_reads_dropped_messages_from_file(self):
+        self.send_all("msg1")
+        first = gc.messages[0].timestamp
+        self.send_all("msg2", "msg3", "msg4")
+        r = client.get("/messages", params={"after_timestamp": first})
+        assert [m["message"] for m in r.json()] == ["msg2", "msg3", "msg4"]
+
+    def test_after_index_skips_partial_line_in_archive(self, tmp_path):
+        (tmp_path / "chat_messages.jsonl").write_text(
+            '{"username": "A", "timestamp": "t1", "message": "msg1"}\n'
+            '{"username": "A", "timestamp": "t2", "message": "msg2"}\n'
+            '{"username": "A", "timest',
+            encoding="utf-8",
+        )
+        gc.load_messages()
+        self.send_all("msg3", "msg4", "msg5")
+        r = client.get("/messages", params={"after_index": 1})
+        assert [m["message"] for m in r.json()] == ["msg2", "msg3", "msg4", "msg5"]
+
+    def test_after_index_uses_stored_index_when_a_line_is_lost(self, tmp_path):
+        (tmp_path / "chat_messages.jsonl").write_text(
+            "".join(f'{{"username": "A", "timestamp": "t{i}", "message": "msg{i}", "index": {i}}}\n' for i in (0, 2, 3, 4, 5)),
+            encoding="utf-8",
+        )
+        gc.load_messages()
+        r = client.get("/messages", params={"after_index": 1})
+        assert [m["message"] for m in r.json()] == ["msg2", "msg3", "msg4", "msg5"]
+
+    def test_load_keeps_latest_messages_and_counts_all(self, tmp_path):
+        (tmp_path / "chat_messages.txt").write_text("A||t1||m1\nB||t2||m2\nC||t3||m3\n", encoding="utf-8")
+        gc.load_messages()
+        assert [m.message for m in gc.messages] == ["m2", "m3"]
+        assert gc.total_stored == 3
+        assert client.get("/status").json()["active_users"] == 3
+
+
+# ---------------------------------------------------------------------------
+# Background writer
+# ---------------------------------------------------------------------------
+
+class TestWriter:
+    def test_send_does_not_write_in_request(self, tmp_path, mocker, monkeypatch):
+        monkeypatch.setattr(gc, "write_queue", queue.Queue())
+        mocker.patch.object(gc, "start_writer")
+        r = client.post("/send", json={"username": "A", "message": "queued"})
+        assert r.status_code == 200
+        assert not (tmp_path / "chat_messages.jsonl").exists()
+        path, line = gc.write_queue.get_nowait()
+        gc.write_queue.task_done()  # the teardown flush joins this queue
+        assert path == str(tmp_path / "chat_messages.jsonl")
+        assert json.loads(line)["message"] == "queued"
+
+    def test_write_batch_writes_each_file_once(self, tmp_path, mocker):
+        first, second = str(tmp_path / "a.jsonl"), str(tmp_path / "b.jsonl")
+        mock_file = mocker.patch("builtins.open", mocker.mock_open())
+
+        gc.write_batch([(first, b"1\n"), (second, b"2\n"), (first, b"3\n")])
+
+        assert [call.args[0] for call in mock_file.call_args_list] == [first, second]
+        writes = [call.args[0] for call in mock_file.return_value.write.call_args_list]
+        assert writes == [b"1\n3\n", b"2\n"]
+
+    def test_write_batch_returns_items_it_could_not_write(self, tmp_path, capsys):
+        good, bad = str(tmp_path / "chat.jsonl"), str(tmp_path / "missing" / "chat.jsonl")
+        failed = gc.write_batch([(good, b"1\n"), (bad, b"2\n"), (bad, b"3\n")])
+        assert failed == [(bad, b"2\n"), (bad, b"3\n")]
+        assert (tmp_path / "chat.jsonl").read_bytes() == b"1\n"
+        assert "Failed to persist 2 messages" in capsys.readouterr().err
+
+    def test_persist_batch_retries_failed_items(self, tmp_path, monkeypatch, mocker):
+        monkeypatch.setattr(gc, "WRITE_RETRY_DELAY", 0)
+        item = (str(tmp_path / "chat.jsonl"), b"x\n")
+        write_batch = mocker.patch.object(gc, "write_batch", side_effect=[[item], []])
+        gc.persist_batch([item, (str(tmp_path / "chat.jsonl"), b"y\n")])
+        assert write_batch.call_args_list[1].args == ([item],)
+        assert write_batch.call_count == 2
+
+    def test_persist_batch_gives_up_after_all_attempts(self, tmp_path, monkeypatch, mocker, capsys):
+        monkeypatch.setattr(gc, "WRITE_RETRY_DELAY", 0)
+        write_batch = mocker.spy(gc, "write_batch")
+        gc.persist_batch([(str(tmp_path / "missing" / "chat.jsonl"), b"x\n")])
+        assert write_batch.call_count == gc.WRITE_ATTEMPTS
+        assert "Giving up on 1 messages" in capsys.readouterr().err
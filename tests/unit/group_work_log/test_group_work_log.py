@@ -1,5 +1,7 @@
 """Unit tests for group_work_log/group_work_log.py"""
-from unittest.mock import MagicMock
+import concurrent.futures
+import json
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
@@ -17,20 +19,26 @@ def mock_llm(mocker):
     """Mock the Anthropic client so no real API calls are made."""
     mock_resp = MagicMock()
     mock_resp.content = [MagicMock(text="• Did thing A\n• Used tool B\n• Got result C")]
-    mocker.patch.object(group_work_log.claude_client.messages, "create", return_value=mock_resp)
+    mocker.patch.object(group_work_log.claude_client.messages, "create", new_callable=AsyncMock, return_value=mock_resp)
     return mock_resp
 
 
 @pytest.fixture
-def client(tmp_working_dir, mock_llm):
-    """TestClient with fresh state per test."""
+def summary_files(tmp_working_dir, monkeypatch):
+    """Redirect the summary files to the temp directory and start with an empty store."""
+    group_work_log.summaries.clear()
+    monkeypatch.setattr(group_work_log, "SUMMARY_FILE", str(tmp_working_dir / "summaries.jsonl"))
+    monkeypatch.setattr(group_work_log, "LEGACY_SUMMARY_FILE", str(tmp_working_dir / "summaries.txt"))
+    yield tmp_working_dir
     group_work_log.summaries.clear()
-    monkeypatch_attr = group_work_log.SUMMARY_FILE
-    group_work_log.SUMMARY_FILE = str(tmp_working_dir / "summaries.txt")
+
+
+@pytest.fixture
+def client(summary_files, mock_llm):
+    """TestClient with fresh state per test."""
+    group_work_log.summary_cache.clear()
     with TestClient(app) as c:
         yield c
-    group_work_log.summaries.clear()
-    group_work_log.SUMMARY_FILE = monkeypatch_attr
 
 
 _SAMPLE_MESSAGES = [
@@ -83,11 +91,89 @@ class TestSubmitWorklog:
 
     def test_persists_to_file(self, client, tmp_working_dir):
         client.post("/submit-worklog", json=_WORKLOG_PAYLOAD)
-        summary_file = tmp_working_dir / "summaries.txt"
+        summary_file = tmp_working_dir / "summaries.jsonl"
         assert summary_file.exists()
         content = summary_file.read_text()
         assert "TestAgent" in content
 
+    def test_file_format_is_one_json_object_per_line(self, client, tmp_working_dir):
+        r = client.post("/submit-worklog", json=_WORKLOG_PAYLOAD)
+        lines = (tmp_working_dir / "summaries.jsonl").read_text().splitlines()
+        stored = json.loads(lines[0])
+        assert stored["timestamp"] == r.json()["summary_timestamp"]
+        assert stored["agents"] == ["TestAgent"]
+        assert "Did thing A" in stored["summary"]
+
+    def test_summary_contains_llm_response(self, client):
+        client.post("/submit-worklog", json=_WORKLOG_PAYLOAD)
+        summary = client.get("/summaries").json()[0]["summary"]
+        assert "Did thing A" in summary
+
+    def test_lock_is_not_held_during_llm_call(self, client, mock_llm):
+        lock_states = []
+
+        def create(**kwargs):
+            lock_states.append(group_work_log.lock.locked())
+            return mock_llm
+
+        group_work_log.claude_client.messages.create.side_effect = create
+        client.post("/submit-worklog", json=_WORKLOG_PAYLOAD)
+        assert lock_states == [False]
+
+    def test_file_is_written_off_the_event_loop(self, client, mocker):
+        to_thread = mocker.spy(group_work_log.asyncio, "to_thread")
+        client.post("/submit-worklog", json=_WORKLOG_PAYLOAD)
+        to_thread.assert_called_once()
+        assert to_thread.call_args.args[:2] == (group_work_log.append_to_file, group_work_log.SUMMARY_FILE)
+
+    def test_concurrent_submissions_are_stored_in_timestamp_order(self, client):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as pool:
+            list(pool.map(
+                lambda i: client.post("/submit-worklog", json={**_WORKLOG_PAYLOAD, "agent_name": f"A{i}"}),
+                range(10),
+            ))
+        timestamps = [s["timestamp"] for s in client.get("/summaries").json()]
+        assert len(timestamps) == 10
+        assert timestamps == sorted(timestamps)
+
+
+# ---------------------------------------------------------------------------
+# Summary cache
+# ---------------------------------------------------------------------------
+
+class TestSummaryCache:
+    def test_repeated_worklog_calls_llm_once(self, client):
+        client.post("/submit-worklog", json=_WORKLOG_PAYLOAD)
+        client.post("/submit-worklog", json={**_WORKLOG_PAYLOAD, "agent_name": "AgentB"})
+        assert group_work_log.claude_client.messages.create.call_count == 1
+
+    def test_cached_summary_keeps_its_own_header(self, client):
+        client.post("/submit-worklog", json=_WORKLOG_PAYLOAD)
+        client.post("/submit-worklog", json={**_WORKLOG_PAYLOAD, "agent_name": "AgentB"})
+        second = client.get("/summaries").json()[1]["summary"]
+        assert second.startswith("=== AGENT: AgentB ===")
+        assert "Did thing A" in second
+
+    def test_different_actions_call_llm_again(self, client):
+        other = [{"role": "assistant", "content": [{"type": "text", "text": "Something else."}]}]
+        client.post("/submit-worklog", json=_WORKLOG_PAYLOAD)
+        client.post("/submit-worklog", json={**_WORKLOG_PAYLOAD, "messages": other})
+        assert group_work_log.claude_client.messages.create.call_count == 2
+
+    def test_failed_call_is_not_cached(self, client):
+        recovered = MagicMock(content=[MagicMock(text="recovered")])
+        group_work_log.claude_client.messages.create.side_effect = [RuntimeError("boom"), recovered]
+        client.post("/submit-worklog", json=_WORKLOG_PAYLOAD)
+        client.post("/submit-worklog", json=_WORKLOG_PAYLOAD)
+        assert "recovered" in client.get("/summaries").json()[1]["summary"]
+
+    def test_evicts_least_recently_used(self, client, monkeypatch):
+        monkeypatch.setattr(group_work_log, "SUMMARY_CACHE_SIZE", 1)
+        other = [{"role": "assistant", "content": [{"type": "text", "text": "Something else."}]}]
+        for messages in (_SAMPLE_MESSAGES, other, _SAMPLE_MESSAGES):
+            client.post("/submit-worklog", json={**_WORKLOG_PAYLOAD, "messages": messages})
+        assert group_work_log.claude_client.messages.create.call_count == 3
+
 
 # ---------------------------------------------------------------------------
 # GET /summaries
@@ -118,11 +204,74 @@ class TestGetSummaries:
         data = r.json()
         assert len(data) == 1
 
+    def test_after_timestamp_accepts_stored_timestamp_with_offset(self, client):
+        first = client.post("/submit-worklog", json=_WORKLOG_PAYLOAD).json()["summary_timestamp"]
+        client.post("/submit-worklog", json={**_WORKLOG_PAYLOAD, "agent_name": "AgentB"})
+        r = client.get("/summaries", params={"after_timestamp": first})
+        assert r.status_code == 200
+        assert [s["agents"] for s in r.json()] == [["AgentB"]]
+
+    def test_after_latest_timestamp_returns_empty_list(self, client):
+        latest = client.post("/submit-worklog", json=_WORKLOG_PAYLOAD).json()["summary_timestamp"]
+        assert client.get("/summaries", params={"after_timestamp": latest}).json() == []
+
     def test_returns_400_for_invalid_timestamp(self, client):
         r = client.get("/summaries?after_timestamp=not-a-date")
         assert r.status_code == 400
 
 
+# ---------------------------------------------------------------------------
+# read_previous_summaries
+# ---------------------------------------------------------------------------
+
+class TestReadPreviousSummaries:
+    def test_loads_jsonl_summaries_with_their_timestamp(self, summary_files):
+        (summary_files / "summaries.jsonl").write_text(
+            '{"timestamp": "2025-01-01T10:00:00+00:00", "summary": "s", "agents": ["A"]}\n', encoding="utf-8"
+        )
+        group_work_log.read_previous_summaries()
+        assert [(s.timestamp, s.summary, s.agents) for s in group_work_log.summaries] == [
+            ("2025-01-01T10:00:00+00:00", "s", ["A"]),
+        ]
+
+    def test_skips_truncated_jsonl_line(self, summary_files):
+        (summary_files / "summaries.jsonl").write_text(
+            '{"timestamp": "t", "summary": "s", "agents": ["A"]}\n{"timestamp": "t2", "summ', encoding="utf-8"
+        )
+        group_work_log.read_previous_summaries()
+        assert len(group_work_log.summaries) == 1
+
+    def test_loads_legacy_text_summaries(self, summary_files):
+        (summary_files / "summaries.txt").write_text(
+            "=== AGENT: A ===\nTIMESPAN: 2024-01-01T00:00:00 to 2024-01-01T01:00:00\nTOTAL STEPS: 1\n\n• did it\n\n",
+            encoding="utf-8",
+        )
+        group_work_log.read_previous_summaries()
+        assert [(s.timestamp, s.agents) for s in group_work_log.summaries] == [("2024-01-01T01:00:00", ["A"])]
+
+    def test_startup_loads_then_removes_both_files(self, summary_files, mock_llm):
+        (summary_files / "summaries.jsonl").write_text(
+            '{"timestamp": "t", "summary": "s", "agents": ["A"]}\n', encoding="utf-8"
+        )
+        (summary_files / "summaries.txt").write_text("old", encoding="utf-8")
+        with TestClient(app) as c:
+            assert len(c.get("/summaries").json()) == 1
+        assert not (summary_files / "summaries.jsonl").exists()
+        assert not (summary_files / "summaries.txt").exists()
+
+    def test_startup_sorts_summaries_by_timestamp(self, summary_files, mock_llm):
+        (summary_files / "summaries.txt").write_text(
+            "=== AGENT: B ===\nTIMESPAN: x to 2024-01-02T00:00:00\n\n"
+            "=== AGENT: A ===\nTIMESPAN: x to 2024-01-01T00:00:00\n\n",
+            encoding="utf-8",
+        )
+        with TestClient(app) as c:
+            r = c.get("/summaries", params={"after_timestamp": "2024-01-01T12:00:00"})
+            assert [s["agents"] for s in r.json()] == [["B"]]
+        assert not (summary_files / "summaries.jsonl").exists()
+        assert not (summary_files / "summaries.txt").exists()
+
+
 # ---------------------------------------------------------------------------
 # extract_assistant_actions
 # ---------------------------------------------------------------------------
@@ -166,3 +315,24 @@ class TestExtractAssistantActions:
         result = extract_assistant_actions(messages)
         assert "First action" in result
         assert "Second action" in result
+
+    def test_tool_use_without_name_or_input_uses_defaults(self):
+        messages = [{"role": "assistant", "content": [{"type": "tool_use"}]}]
+        assert extract_assistant_actions(messages) == "Tool used: unknown tool with input: {}"
+
+    def test_skips_blocks_without_type(self):
+        messages = [{"role": "assistant", "content": [{"text": "untyped"}, {"type": "text", "text": "typed"}]}]
+        assert extract_assistant_actions(messages) == "typed"
+
+    def test_joins_actions_in_order_with_blank_lines(self):
+        messages = [
+            {"role": "assistant", "content": [
+                {"type": "text", "text": "Reading"},
+                {"type": "tool_use", "name": "read_file", "input": {"path": "a"}},
+                {"type": "tool_result", "content": "ignored"},
+            ]},
+            {"role": "assistant", "content": "Done"},
+        ]
+        assert extract_assistant_actions(messages) == (
+            "Reading\n\nTool used: read_file with input: {'path': 'a'}\n\nDone"
+        )